@@ -3,7 +3,7 @@
 #################
 
 import pygame
-import Board
+from engine import Board
 
 # Get layout from board class so that there are not multiple instances of magic numbers
 COL_COUNT = Board.COL_COUNT
@@ -0,0 +1,244 @@
+####################
+#  Batch Analysis  #
+####################
+# Non-interactive best move and score analysis for files of positions.
+# Each input line is a move string of column digits (1-7, Player 1 first),
+# and each output line is a JSON object, written in input order.
+#
+# Usage:
+#   python analyze.py positions.txt --depth 5 -o results.jsonl
+#   cat positions.txt | python analyze.py --movetime 0.5 --workers 8
+#   python analyze.py positions.txt --depth 6 -o results.jsonl --resume
+#   python analyze.py positions.txt --depth 6 --cache analysis.cache   (shared, persistent results)
+
+from engine import Board, Player
+from engine.AnalysisCache import AnalysisCache
+
+import argparse
+import collections
+import concurrent.futures
+import json
+import math
+import os
+import sys
+import time
+
+# Estimated growth in search time from one depth to the next, used for time budgets
+BRANCHING_ESTIMATE = 5
+
+# Analysis cache of a worker process, opened by open_cache
+_cache = None
+
+
+# A function to open the shared analysis cache in a worker process
+def open_cache(path):
+    """A function to open the shared analysis cache, run once in each worker process.
+
+    :param path: path of the cache file
+    :type path: str
+
+    :return: *None*
+    """
+    global _cache
+    _cache = AnalysisCache(path)
+
+
+# A function to analyse a single position, run inside a worker process
+def analyze_position(moves, depth=None, movetime=None):
+    """A function to find the best move and score of a position with :meth:`Player.Player.minimax`.
+
+    With *movetime*, the search deepens one ply at a time and stops before a depth that is
+    predicted to overrun the budget, since a minimax call can not be interrupted.
+
+    :param moves: string of column digits (1-7) played so far
+    :type moves: str
+    :param depth: fixed search depth, defaults to *None*
+    :type depth: int, optional
+    :param movetime: time budget in seconds used instead of depth, defaults to *None*
+    :type movetime: float, optional
+
+    :return: result with position, best (column digit), score, depth and time, or an error
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    result = {"position": moves}
+    try:
+        board = Board.board_from_moves(moves)
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+
+    if board.winner is not None or not board.get_valid_positions():
+        result["error"] = "Game is over"
+        return result
+
+    AI = Player.Player(2, (len(moves) % 2) + 1)
+    maxDepth = board.ROW_COUNT * board.COL_COUNT - len(moves)
+
+    if _cache is not None and movetime is None:
+        entry = _cache.lookup(board.key())
+        if entry is not None and entry[0] >= min(depth, maxDepth) and entry[2] is not None:
+            result["best"] = entry[2] + 1
+            # The cache stores scores as floats, fresh searches report ints
+            result["score"] = int(entry[1])
+            result["depth"] = entry[0]
+            result["time"] = round(time.perf_counter() - start, 4)
+            result["cached"] = True
+            return result
+
+    if movetime is None:
+        searchDepth = min(depth, maxDepth)
+        col, score = AI.minimax(board, searchDepth, -math.inf, math.inf, True)
+    else:
+        searchDepth = 0
+        lastTime = 0
+        while searchDepth < maxDepth:
+            elapsed = time.perf_counter() - start
+            if searchDepth > 0 and elapsed + lastTime * BRANCHING_ESTIMATE > movetime:
+                break
+            iterStart = time.perf_counter()
+            col, score = AI.minimax(board, searchDepth + 1, -math.inf,
+                                    math.inf, True)
+            lastTime = time.perf_counter() - iterStart
+            searchDepth += 1
+
+    if col is None:
+        col = board.get_valid_positions()[0]
+    if _cache is not None:
+        _cache.store(board.key(), searchDepth, score, col)
+    result["best"] = col + 1
+    result["score"] = int(score)
+    result["depth"] = searchDepth
+    result["time"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+# A function to read positions from a stream, skipping blank lines
+def read_positions(stream):
+    """A function to yield positions from a stream, one per non-blank line.
+
+    :param stream: text stream to read
+    :type stream: file
+
+    :return: generator of move strings
+    :rtype: generator
+    """
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+
+# A function to count results already written by a previous run
+def completed_results(path):
+    """A function to count complete result lines in an output file, dropping a partial last line.
+
+    :param path: path of the output file
+    :type path: str
+
+    :return: number of complete lines, *0* if the file does not exist
+    :rtype: int
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        # A run that was killed mid-write leaves a partial line behind
+        if end != len(data):
+            f.truncate(end)
+        return data.count(b"\n", 0, end)
+
+
+# A function to analyse a stream of positions across worker processes
+def analyze_stream(positions, out, workers=None, depth=5, movetime=None,
+                   cachePath=None):
+    """A function to analyse positions across worker processes and write JSON lines in input order.
+
+    At most a few positions per worker are in flight, so arbitrarily large inputs are streamed.
+
+    :param positions: iterable of move strings
+    :type positions: iterable
+    :param out: text stream results are written to
+    :type out: file
+    :param workers: number of worker processes, defaults to the CPU count
+    :type workers: int, optional
+    :param cachePath: path of an analysis cache shared by the workers, defaults to *None*
+    :type cachePath: str, optional
+
+    :return: number of positions analysed
+    :rtype: int
+    """
+    count = 0
+    workers = workers or os.cpu_count() or 1
+    initializer = open_cache if cachePath is not None else None
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=initializer,
+            initargs=(cachePath,)) as executor:
+        window = workers * 4
+        inFlight = collections.deque()
+        positions = iter(positions)
+        exhausted = False
+        while inFlight or not exhausted:
+            while not exhausted and len(inFlight) < window:
+                try:
+                    moves = next(positions)
+                except StopIteration:
+                    exhausted = True
+                    break
+                inFlight.append(
+                    executor.submit(analyze_position, moves, depth, movetime))
+
+            if inFlight:
+                out.write(json.dumps(inFlight.popleft().result()) + "\n")
+                out.flush()
+                count += 1
+    return count
+
+
+# code here will be ran when analyze.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Batch Connect-4 position analysis")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file of move strings, one per line (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="JSON lines output file (default: stdout)")
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument("--depth", type=int, default=5)
+    budget.add_argument("--movetime", type=float,
+                        help="seconds per position instead of a fixed depth")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--resume", action="store_true",
+                        help="skip positions already in the output file and append")
+    parser.add_argument("--cache", help="persistent analysis cache file shared by the workers")
+    args = parser.parse_args()
+
+    if args.resume and args.output == "-":
+        parser.error("--resume needs an output file")
+
+    # Refuse an unusable cache here, rather than in every worker process
+    if args.cache:
+        try:
+            AnalysisCache(args.cache).close()
+        except ValueError as e:
+            parser.error(str(e))
+
+    skip = completed_results(args.output) if args.resume else 0
+    inStream = sys.stdin if args.input == "-" else open(args.input)
+    if args.output == "-":
+        outStream = sys.stdout
+    else:
+        outStream = open(args.output, "a" if args.resume else "w")
+
+    positions = read_positions(inStream)
+    for _ in zip(range(skip), positions):
+        pass
+
+    start = time.perf_counter()
+    count = analyze_stream(positions, outStream, args.workers, args.depth,
+                           args.movetime, args.cache)
+    elapsed = time.perf_counter() - start
+
+    print(f"analysed {count} positions ({skip} resumed) in {elapsed:.2f}s: "
+          f"{count / elapsed if elapsed else 0:.1f} positions/s",
+          file=sys.stderr)
@@ -0,0 +1,160 @@
+####################
+# Best-First Bench #
+####################
+# Compares the best-first (SSS*) search with minimax at equal time budgets. Each search
+# deepens one ply at a time on the same positions until its budget runs out, and the
+# deepest finished depth, the nodes visited and the States kept in memory are reported.
+# Both searches find the same value at every depth, which is checked as they go.
+#
+# With --check, positions where forgetting nodes once gave a wrong value are searched
+# under small memory caps and compared with minimax, exiting with status 1 on a mismatch.
+#
+# Usage:
+#   python bestfirst.py --positions 20 --budget 1.0
+#   python bestfirst.py --positions 20 --budget 1.0 --max-nodes 500   (tight memory cap)
+#   python bestfirst.py --check
+
+from engine import Board, Player
+import selfplay
+
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+
+# (moves, depth) of positions checked by --check
+REGRESSIONS = [("16324441", 4)]
+
+# Memory caps the --check positions are searched with
+CHECK_NODES = [20, 25, 30, 35, 40, 60]
+
+
+# A function to deepen one search until its time budget runs out
+def deepen(AI, board, budget, searchFunction):
+    """A function to search one ply deeper at a time until the time budget runs out.
+
+    :param AI: Player whose stopEvent is set when the budget runs out
+    :type AI: :class:`Player.Player`
+    :param board: position to search
+    :type board: :class:`Board.Board`
+    :param budget: seconds to search for
+    :type budget: float
+    :param searchFunction: function taking a depth and returning (column, value)
+    :type searchFunction: function
+
+    :return: (depth, column, value, nodes) of each finished depth
+    :rtype: list of tuples
+    """
+    AI.stopEvent = threading.Event()
+    timer = threading.Timer(budget, AI.stopEvent.set)
+    timer.start()
+    finished = []
+    try:
+        for depth in range(1, Board.ROW_COUNT * Board.COL_COUNT + 1):
+            AI.nodes = 0
+            col, value = searchFunction(depth)
+            finished.append((depth, col, value, AI.nodes))
+            if abs(value) >= Player.WIN_SCORE:
+                break
+    except Player.SearchStopped:
+        pass
+    finally:
+        timer.cancel()
+    return finished
+
+
+# A function to compare best-first search under small memory caps with minimax
+def check(positions, caps):
+    """A function to check that the best-first search finds the minimax value under each memory cap.
+
+    :param positions: (moves, depth) of each position
+    :type positions: list of tuples
+    :param caps: most States in use at once
+    :type caps: list of int values
+
+    :return: *True* if every value matched, *False* if not
+    :rtype: bool
+    """
+    matched = True
+    for moves, depth in positions:
+        board = Board.board_from_moves(moves)
+        sideValue = (len(moves) % 2) + 1
+        expected = Player.Player(2, sideValue).minimax(board, depth, -math.inf,
+                                                       math.inf, True)[1]
+        for cap in caps:
+            col, value = Player.Player(5, sideValue).best_first(board, depth, cap)
+            if value != expected:
+                matched = False
+                print(f"MISMATCH: {moves} depth {depth} max nodes {cap}: "
+                      f"best-first {value}, minimax {expected}")
+        print(f"{moves} depth {depth}: minimax {expected}, caps {caps} checked")
+    return matched
+
+
+# code here will be ran when bestfirst.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Best-first search against minimax at equal time")
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds per search of each position")
+    parser.add_argument("--max-nodes", type=int, default=Player.BEST_FIRST_NODES,
+                        help="most States the best-first search keeps in memory")
+    parser.add_argument("--opening", type=int, default=8,
+                        help="random moves played to make each position")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true",
+                        help="compare with minimax on known positions under small memory caps")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check(REGRESSIONS, CHECK_NODES) else 1)
+
+    rng = random.Random(args.seed)
+    totals = {"minimaxDepth": 0, "bestDepth": 0, "minimaxNodes": 0,
+              "bestNodes": 0, "positions": 0, "mismatches": 0}
+    print(f"{'position':<14} {'minimax depth':>13} {'nodes':>8} "
+          f"{'best-first depth':>16} {'nodes':>8} {'States':>7}")
+    while totals["positions"] < args.positions:
+        moves = selfplay.random_opening(rng, args.opening)
+        board = Board.board_from_moves(moves)
+        if board.winner is not None:
+            continue
+        sideValue = (len(moves) % 2) + 1
+
+        minimaxAI = Player.Player(2, sideValue)
+        minimaxRuns = deepen(minimaxAI, board, args.budget,
+                             lambda depth: minimaxAI.minimax(board, depth, -math.inf,
+                                                             math.inf, True))
+        bestAI = Player.Player(5, sideValue, maxNodes=args.max_nodes)
+        bestRuns = deepen(bestAI, board, args.budget,
+                          lambda depth: bestAI.best_first(board, depth))
+
+        # Compare node counts only at the depths both searches finished
+        common = min(len(minimaxRuns), len(bestRuns))
+        for minimaxRun, bestRun in zip(minimaxRuns, bestRuns):
+            if minimaxRun[2] != bestRun[2]:
+                totals["mismatches"] += 1
+                print(f"value mismatch at depth {minimaxRun[0]}: "
+                      f"minimax {minimaxRun[2]}, best-first {bestRun[2]}")
+        if common:
+            totals["minimaxNodes"] += sum(run[3] for run in minimaxRuns[:common])
+            totals["bestNodes"] += sum(run[3] for run in bestRuns[:common])
+        totals["minimaxDepth"] += minimaxRuns[-1][0] if minimaxRuns else 0
+        totals["bestDepth"] += bestRuns[-1][0] if bestRuns else 0
+        totals["positions"] += 1
+
+        print(f"{moves:<14} {minimaxRuns[-1][0] if minimaxRuns else 0:>13} "
+              f"{minimaxRuns[-1][3] if minimaxRuns else 0:>8} "
+              f"{bestRuns[-1][0] if bestRuns else 0:>16} "
+              f"{bestRuns[-1][3] if bestRuns else 0:>8} {bestAI.pool.created:>7}")
+
+    positions = totals["positions"]
+    print(f"mean depth in {args.budget}s: minimax {totals['minimaxDepth'] / positions:.2f}, "
+          f"best-first {totals['bestDepth'] / positions:.2f}")
+    if totals["minimaxNodes"]:
+        print(f"nodes at depths both finished: minimax {totals['minimaxNodes']}, "
+              f"best-first {totals['bestNodes']} "
+              f"({totals['bestNodes'] / totals['minimaxNodes']:.0%} of minimax)")
+    print(f"value mismatches: {totals['mismatches']}")
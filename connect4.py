@@ -2,12 +2,12 @@
 # edit player/AI, AI/AI, or AI/input, or input/input game modes here.
 
 # Import various classes needed for connect4 game
-import Board  
-import State
-import GUI
-import Player
+# GUI is imported only when a GUI game is played, so headless games do not load pygame
+from engine import Board, Metrics, State, Player
+import selfplay
 
 # Import required python modules
+import argparse
 import math
 import sys
 
@@ -70,6 +70,7 @@ def play_console():
 
 # A function to play connect-4 in a GUI format
 def play_GUI():
+    import GUI
 
     # Create Player of type Random
     AI = Player.Player(2, 2)
@@ -165,9 +166,83 @@ def play_GUI():
     screen.game_over(winner, 3500)
 
 
+# A function to play a game between two automated players without a GUI
+def play_headless(player1Type, player2Type, depth):
+    """A function to play a game between two automated players without a GUI, printing the result.
+
+    :param player1Type: type of Player 1 (1: Random, 2: Minimax, 3: Principal Variation Search)
+    :type player1Type: int
+    :param player2Type: type of Player 2
+    :type player2Type: int
+    :param depth: search depth of both players
+    :type depth: int
+
+    :return: player who won the game, *0* for a draw
+    :rtype: int
+    """
+    winner, moves = selfplay.play_game(Player.Player(player1Type, 1, depth),
+                                       Player.Player(player2Type, 2, depth))
+    print(Board.board_from_moves(moves))
+    print("Moves: " + moves)
+    if winner == 0:
+        print("Draw!")
+    else:
+        print("Player " + str(winner) + " Won!")
+    return winner
+
+
+# A function to choose a game mode from the command line
+def main(argv=None):
+    """A function to start a game in the mode given on the command line.
+
+    :param argv: command line arguments, defaults to *sys.argv[1:]*
+    :type argv: list, optional
+
+    :return: *None*
+    """
+    parser = argparse.ArgumentParser(description="Play Connect-4")
+    parser.add_argument("--mode", choices=["gui", "console", "headless", "engine"],
+                        default="gui")
+    parser.add_argument("--player1", type=int, default=3,
+                        help="headless Player 1 type (1: Random, 2: Minimax, 3: PVS, 4: Value Network, 5: Best-First)")
+    parser.add_argument("--player2", type=int, default=2,
+                        help="headless Player 2 type")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--cache", help="engine mode analysis cache file")
+    parser.add_argument("--metrics",
+                        help="file AI move metrics are written to (.json for JSON, else Prometheus text)")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="seconds between metrics snapshots")
+    args = parser.parse_args(argv)
+
+    if args.mode == "engine":
+        import textengine
+        textengine.main(["--cache", args.cache] if args.cache else [])
+        return
+
+    exporter = None
+    if args.metrics:
+        exporter = Metrics.Exporter(Metrics.METRICS, args.metrics,
+                                    args.metrics_interval)
+    try:
+        if args.mode == "headless":
+            play_headless(args.player1, args.player2, args.depth)
+            return
+
+        # play_GUI checks moves against the module-level board
+        global board
+        board = Board.Board()
+        state = State.State(board, None, 0)
+        path.append(state)
+        if args.mode == "console":
+            play_console()
+        else:
+            play_GUI()
+    finally:
+        if exporter is not None:
+            exporter.stop()
+
+
 # code here will be ran when connect4.py is ran
 if __name__ == '__main__':
-    board = Board.Board()
-    state = State.State(board, None, 0)
-    path.append(state)
-    play_GUI()
+    main()
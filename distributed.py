@@ -0,0 +1,385 @@
+####################
+# Distributed Play #
+####################
+# Spreads headless self-play over several hosts. A coordinator hands out work units
+# (a seed, a number of games and the two player configurations) over TCP, and workers
+# play them with the engine and send back compact results.
+#
+# Every message is one line of JSON:
+#   worker      -> coordinator  {"type": "hello", "worker": name}
+#   coordinator -> worker       {"type": "unit", "id": n, "seed": s, "games": g, "player1": {...}, "player2": {...}, "openingPlies": k}
+#   worker      -> coordinator  {"type": "heartbeat"}                 (every --heartbeat seconds while connected)
+#   worker      -> coordinator  {"type": "result", "id": n, "wins": [draws, p1, p2], "moves": m, "time": t}
+#   coordinator -> worker       {"type": "done"}                      (no work left)
+# Malformed messages are dropped and logged by the coordinator.
+# A unit whose worker stops sending heartbeats or disconnects is handed to another worker.
+# Games are seeded by the unit, so a reassigned unit plays exactly the same games.
+#
+# Usage:
+#   python distributed.py coordinator --units 100 --games 10 --port 5555
+#   python distributed.py worker --host coordinator-host --port 5555
+#   python distributed.py local --workers 4 --units 20      (coordinator and workers on one machine)
+
+from engine import Player
+import selfplay
+
+import argparse
+import asyncio
+import collections
+import json
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+
+# Seconds between worker heartbeats
+HEARTBEAT_INTERVAL = 1.0
+# Seconds without a message before a worker's unit is reassigned
+HEARTBEAT_TIMEOUT = 5.0
+
+
+# A function to play every game of a work unit
+def play_unit(unit):
+    """A function to play every game of a work unit.
+
+    :param unit: work unit message
+    :type unit: dict
+
+    :return: result message for the unit
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    wins = [0, 0, 0]
+    moveCount = 0
+    for game in range(unit["games"]):
+        # A prime multiplier keeps the games of neighbouring unit seeds apart at any unit size
+        seed = unit["seed"] * 1000003 + game
+        # Random players use the global generator, so it is seeded for repeatable games
+        random.seed(seed)
+        opening = selfplay.random_opening(random.Random(seed),
+                                          unit["openingPlies"])
+        player1 = Player.Player(unit["player1"]["type"], 1,
+                                unit["player1"]["depth"])
+        player2 = Player.Player(unit["player2"]["type"], 2,
+                                unit["player2"]["depth"])
+        winner, moves = selfplay.play_game(player1, player2, opening)
+        wins[winner] += 1
+        moveCount += len(moves)
+    return {"type": "result", "id": unit["id"], "wins": wins,
+            "moves": moveCount, "time": round(time.perf_counter() - start, 3)}
+
+
+class Coordinator:
+    """This class hands out work units to workers and collects their results.
+
+    :param units: work unit messages to play
+    :type units: list of dict
+    :param heartbeatTimeout: seconds without a message before a worker's unit is reassigned
+    :type heartbeatTimeout: float
+    :param reportInterval: seconds between progress reports
+    :type reportInterval: float
+
+    :Attributes:
+        * :pending (*collections.deque*): units not assigned to any worker
+        * :assigned (*dict*): units being played, keyed by id, as (unit, writer) tuples
+        * :completed (*dict*): results keyed by unit id
+        * :reassigned (*int*): number of units handed out again after losing their worker
+    """
+
+    def __init__(self, units, heartbeatTimeout=HEARTBEAT_TIMEOUT,
+                 reportInterval=5.0):
+        """Constructor Method."""
+        self.total = len(units)
+        self.pending = collections.deque(units)
+        self.assigned = {}
+        self.completed = {}
+        self.reassigned = 0
+        self.unitIds = {unit["id"] for unit in units}
+        self.heartbeatTimeout = heartbeatTimeout
+        self.reportInterval = reportInterval
+        self.lastSeen = {}
+        self.names = {}
+        self.idle = set()
+        self.workerGames = collections.Counter()
+        self.finished = asyncio.Event()
+        self.start = time.perf_counter()
+
+    # A function to send one message to a worker
+    def _send(self, writer, message):
+        writer.write((json.dumps(message) + "\n").encode())
+
+    # A function to check a worker message has the fields its type needs
+    def _valid(self, message):
+        if not isinstance(message, dict):
+            return False
+        if message.get("type") == "hello" or message.get("type") == "heartbeat":
+            return True
+        if message.get("type") == "result":
+            wins = message.get("wins")
+            return (message.get("id") in self.unitIds and isinstance(wins, list)
+                    and len(wins) == 3 and all(isinstance(count, int) for count in wins)
+                    and isinstance(message.get("moves"), int))
+        return False
+
+    # A function to give a worker its next unit, or tell it there is no work left
+    def _dispatch(self, writer):
+        if self.pending:
+            unit = self.pending.popleft()
+            self.assigned[unit["id"]] = (unit, writer)
+            self.idle.discard(writer)
+            self._send(writer, unit)
+        elif len(self.completed) == self.total:
+            self._send(writer, {"type": "done"})
+        else:
+            # Units are still in flight elsewhere and may come back if a worker is lost
+            self.idle.add(writer)
+
+    # A function to put a lost worker's units back in the queue
+    def _requeue(self, writer):
+        for unitId, (unit, owner) in list(self.assigned.items()):
+            if owner is writer:
+                del self.assigned[unitId]
+                self.pending.append(unit)
+                self.reassigned += 1
+        self.lastSeen.pop(writer, None)
+        self.idle.discard(writer)
+        for idleWriter in list(self.idle):
+            if not self.pending:
+                break
+            self._dispatch(idleWriter)
+
+    # A function to serve one worker connection
+    async def handle_worker(self, reader, writer):
+        """A function to serve one worker until it disconnects or there is no work left.
+
+        :param reader: stream to read messages from
+        :type reader: asyncio.StreamReader
+        :param writer: stream to write messages to
+        :type writer: asyncio.StreamWriter
+
+        :return: *None*
+        """
+        self.lastSeen[writer] = time.monotonic()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                self.lastSeen[writer] = time.monotonic()
+                # Malformed messages are dropped, a worker is only lost by going silent
+                if not self._valid(message):
+                    print(f"dropped malformed message from worker {self.names.get(writer, '?')}")
+                    continue
+
+                if message["type"] == "hello":
+                    self.names[writer] = message.get("worker", "?")
+                    self._dispatch(writer)
+                elif message["type"] == "result":
+                    unitId = message["id"]
+                    # A unit that was reassigned may be finished twice, only the first result counts
+                    if unitId not in self.completed:
+                        self.completed[unitId] = message
+                        self.workerGames[self.names.get(writer, "?")] += sum(message["wins"])
+                    self.assigned.pop(unitId, None)
+                    if len(self.completed) == self.total:
+                        for idleWriter in list(self.idle):
+                            self._send(idleWriter, {"type": "done"})
+                        self.finished.set()
+                    self._dispatch(writer)
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._requeue(writer)
+            writer.close()
+
+    # A function to reassign the units of workers that stopped sending heartbeats
+    async def watch_heartbeats(self):
+        """A function to reassign the units of workers whose heartbeats stopped, until all units are done.
+
+        :return: *None*
+        """
+        lastReport = time.monotonic()
+        while not self.finished.is_set():
+            await asyncio.sleep(min(1.0, self.heartbeatTimeout / 2))
+            now = time.monotonic()
+            for writer, seen in list(self.lastSeen.items()):
+                if now - seen > self.heartbeatTimeout:
+                    print(f"worker {self.names.get(writer, '?')} lost, reassigning its units")
+                    self._requeue(writer)
+                    writer.close()
+            if now - lastReport >= self.reportInterval:
+                lastReport = now
+                print(self.report())
+
+    def report(self):
+        """A function to return a one line progress and throughput report.
+
+        :return: report text
+        :rtype: str
+        """
+        elapsed = time.perf_counter() - self.start
+        games = sum(sum(result["wins"]) for result in self.completed.values())
+        return (f"units {len(self.completed)}/{self.total}  games {games}  "
+                f"{games / elapsed if elapsed else 0:.1f} games/s  "
+                f"workers {len(self.lastSeen)}  reassigned {self.reassigned}")
+
+    def summary(self):
+        """A function to return the final aggregate results.
+
+        :return: summary text
+        :rtype: str
+        """
+        wins = [0, 0, 0]
+        moveCount = 0
+        for result in self.completed.values():
+            wins = [a + b for a, b in zip(wins, result["wins"])]
+            moveCount += result["moves"]
+        games = sum(wins)
+        lines = [self.report(),
+                 f"Player 1 wins {wins[1]}, Player 2 wins {wins[2]}, draws {wins[0]}, "
+                 f"mean length {moveCount / max(1, games):.1f} moves"]
+        lines += [f"  {name}: {count} games"
+                  for name, count in sorted(self.workerGames.items())]
+        return "\n".join(lines)
+
+
+# A function to make the work units of a run
+def make_units(count, games, player1, player2, openingPlies, seed):
+    """A function to make the work unit messages of a run.
+
+    :return: list of work unit messages
+    :rtype: list of dict
+    """
+    return [{"type": "unit", "id": i, "seed": seed + i, "games": games,
+             "player1": player1, "player2": player2,
+             "openingPlies": openingPlies} for i in range(count)]
+
+
+# A function to run the coordinator until every unit is done
+async def run_coordinator(units, host, port, heartbeatTimeout, ready=None):
+    """A function to run the coordinator until every unit is done, then print the summary.
+
+    :param ready: event set once the coordinator is listening, defaults to *None*
+    :type ready: threading.Event, optional
+
+    :return: the coordinator
+    :rtype: :class:`Coordinator`
+    """
+    coordinator = Coordinator(units, heartbeatTimeout)
+    server = await asyncio.start_server(coordinator.handle_worker, host, port)
+    print(f"coordinator on {host}:{port} with {len(units)} units")
+    if ready is not None:
+        ready.set()
+    async with server:
+        await coordinator.watch_heartbeats()
+    print(coordinator.summary())
+    return coordinator
+
+
+# A function to run a worker until the coordinator has no work left
+def run_worker(host, port, name=None, heartbeat=HEARTBEAT_INTERVAL,
+               crashAfter=None):
+    """A function to play work units from a coordinator until it has no work left.
+
+    :param name: worker name reported to the coordinator, defaults to host:pid
+    :type name: str, optional
+    :param heartbeat: seconds between heartbeats
+    :type heartbeat: float, optional
+    :param crashAfter: exit without sending the result of this unit (counted from 1), to test reassignment
+    :type crashAfter: int, optional
+
+    :return: number of units played
+    :rtype: int
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    sock = socket.create_connection((host, port))
+    stream = sock.makefile("r")
+    sendLock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(message):
+        with sendLock:
+            sock.sendall((json.dumps(message) + "\n").encode())
+
+    # Heartbeats come from a thread, since games keep the main thread busy
+    def beat():
+        while not stopped.wait(heartbeat):
+            try:
+                send({"type": "heartbeat"})
+            except OSError:
+                return
+
+    threading.Thread(target=beat, daemon=True).start()
+    send({"type": "hello", "worker": name})
+    played = 0
+    try:
+        for line in stream:
+            message = json.loads(line)
+            if message["type"] == "done":
+                break
+            result = play_unit(message)
+            played += 1
+            if crashAfter is not None and played >= crashAfter:
+                os._exit(1)
+            send(result)
+    finally:
+        stopped.set()
+        sock.close()
+    return played
+
+
+# code here will be ran when distributed.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Distributed Connect-4 self-play")
+    parser.add_argument("role", choices=["coordinator", "worker", "local"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--units", type=int, default=20)
+    parser.add_argument("--games", type=int, default=5, help="games per unit")
+    parser.add_argument("--player1", type=int, default=3,
+                        help="Player 1 type (1: Random, 2: Minimax, 3: PVS)")
+    parser.add_argument("--player2", type=int, default=2, help="Player 2 type")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--heartbeat-timeout", type=float, default=HEARTBEAT_TIMEOUT)
+    parser.add_argument("--workers", type=int, default=4,
+                        help="local worker processes (local role)")
+    parser.add_argument("--crash-after", type=int,
+                        help="worker exits after this many units, to test reassignment")
+    args = parser.parse_args()
+
+    units = make_units(args.units, args.games,
+                       {"type": args.player1, "depth": args.depth},
+                       {"type": args.player2, "depth": args.depth},
+                       args.opening_plies, args.seed)
+
+    if args.role == "worker":
+        print(f"played {run_worker(args.host, args.port, crashAfter=args.crash_after)} units")
+    elif args.role == "coordinator":
+        asyncio.run(run_coordinator(units, args.host, args.port,
+                                    args.heartbeat_timeout))
+    else:
+        # Worker processes stand in for nodes, the first one crashes if --crash-after is given.
+        # They are spawned rather than forked, as forking after the coordinator thread started
+        # could copy its locks in a held state
+        context = multiprocessing.get_context("spawn")
+        ready = threading.Event()
+        coordinatorThread = threading.Thread(
+            target=lambda: asyncio.run(run_coordinator(
+                units, args.host, args.port, args.heartbeat_timeout, ready)))
+        coordinatorThread.start()
+        ready.wait()
+        workers = [context.Process(
+            target=run_worker, args=(args.host, args.port, f"local-{i}"),
+            kwargs={"crashAfter": args.crash_after if i == 0 else None})
+            for i in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        coordinatorThread.join()
+        for worker in workers:
+            worker.join()
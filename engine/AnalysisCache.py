@@ -0,0 +1,202 @@
+####################
+#  Analysis Cache  #
+####################
+# A persistent position analysis cache shared by processes and kept across restarts.
+#
+# The cache is a fixed-size file of slots, memory mapped by every process that uses it.
+# A position's key (see Board.key) selects a bucket of BUCKET_SIZE neighbouring slots.
+# Each slot stores (check, score, depth, best), where check is the key mixed with the
+# data, so a slot that another process was writing while it was read no longer matches
+# its key and reads can be done without any lock. Writes take an exclusive flock.
+#
+# Scores depend on the evaluation weights, so the header is tagged with the weights the
+# file was created with, and a file with another tag is refused rather than cleared, as
+# other processes may still be using it.
+
+from engine import Board
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import zlib
+
+# File header: magic, format version, number of slots, weights tag
+HEADER = struct.Struct("<4sIQI4x")
+MAGIC = b"C4AC"
+VERSION = 1
+
+# Slot: check, score, depth, best column (-1 for none), padding
+SLOT = struct.Struct("<QdBb6x")
+
+# Number of slots probed for each key
+BUCKET_SIZE = 4
+
+# Multiplier used to spread keys over the slots (64-bit golden ratio)
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+MASK_64 = (1 << 64) - 1
+
+
+# A function to return the tag of a set of evaluation weights
+def _weights_tag(weights):
+    if weights is None:
+        weights = Board.WEIGHTS
+    return zlib.crc32(json.dumps(weights, sort_keys=True).encode())
+
+
+# A function to mix the data of a slot into its key
+def _check(key, score, depth, best):
+    scoreBits = struct.unpack("<Q", struct.pack("<d", score))[0]
+    # key + 1 so that the empty position is not confused with an empty slot
+    return ((key + 1) ^ scoreBits ^ (depth << 56) ^ ((best & 0xff) << 48)) & MASK_64
+
+
+class AnalysisCache:
+    """This class maps position keys to (depth, score, best move) in a memory-mapped file.
+
+    :param path: path of the cache file, created if it does not exist
+    :type path: str
+    :param slots: number of slots when the file is created, defaults to *1048576* (24 MiB)
+    :type slots: int, optional
+    :param weights: evaluation weights the cached scores were computed with, defaults to :data:`Board.WEIGHTS`
+    :type weights: dict, optional
+
+    :Attributes:
+        * :slots (*int*): number of slots in the file
+        * :tag (*int*): tag of the evaluation weights the cached scores were computed with
+        * :hits (*int*): lookups answered by this process
+        * :misses (*int*): lookups not answered by this process
+    """
+
+    def __init__(self, path, slots=1 << 20, weights=None):
+        """Constructor Method.
+
+        :raises:
+            **ValueError**: if the file is not an analysis cache, or was created with different evaluation weights
+        """
+        self.tag = _weights_tag(weights)
+
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self.fd).st_size == 0:
+                os.ftruncate(self.fd, HEADER.size + slots * SLOT.size)
+                os.pwrite(self.fd, HEADER.pack(MAGIC, VERSION, slots, self.tag),
+                          0)
+
+            magic, version, self.slots, fileTag = HEADER.unpack(
+                os.pread(self.fd, HEADER.size, 0))
+            error = None
+            if magic != MAGIC or version != VERSION:
+                error = "Not an analysis cache: " + path
+            elif fileTag != self.tag:
+                error = ("Analysis cache was written with other evaluation weights, "
+                         "remove it or use another file: " + path)
+            else:
+                self.map = mmap.mmap(self.fd, HEADER.size + self.slots * SLOT.size)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        if error is not None:
+            os.close(self.fd)
+            raise ValueError(error)
+
+        self.hits = 0
+        self.misses = 0
+
+    def matches(self, weights):
+        """A function to check whether the cached scores were computed with a set of weights.
+
+        :param weights: evaluation weights, *None* for :data:`Board.WEIGHTS`
+        :type weights: dict or None
+
+        :return: *True* if the cache was created with these weights
+        :rtype: bool
+        """
+        return _weights_tag(weights) == self.tag
+
+    # A function to return the offset of the first slot of a key's bucket
+    def _bucket(self, key):
+        index = ((key * HASH_MULTIPLIER) & MASK_64) % (self.slots - BUCKET_SIZE + 1)
+        return HEADER.size + index * SLOT.size
+
+    def lookup(self, key):
+        """A function to look up the analysis of a position.
+
+        :param key: position key, from :meth:`Board.Board.key`
+        :type key: int
+
+        :return: (depth, score, best column), *None* if the position is not cached
+        :rtype: (int,float,int) tuple or *None*
+        """
+        offset = self._bucket(key)
+        for i in range(BUCKET_SIZE):
+            check, score, depth, best = SLOT.unpack_from(self.map,
+                                                         offset + i * SLOT.size)
+            if check != 0 and _check(key, score, depth, best) == check:
+                self.hits += 1
+                return depth, score, (None if best < 0 else best)
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, best):
+        """A function to store the analysis of a position.
+
+        An existing entry for the position is only replaced by one at least as deep. A new
+        position takes an empty slot of its bucket, otherwise the shallowest entry is evicted
+        when it is not deeper than the new one.
+
+        :param key: position key, from :meth:`Board.Board.key`
+        :type key: int
+        :param depth: search depth of the analysis
+        :type depth: int
+        :param score: score of the position for the player to move
+        :type score: float
+        :param best: best column, or *None*
+        :type best: int or None
+
+        :return: *True* if the entry was written, *False* if deeper entries were kept
+        :rtype: bool
+        """
+        depth = min(depth, 255)
+        best = -1 if best is None else best
+        offset = self._bucket(key)
+
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            target = None
+            shallowest = None
+            for i in range(BUCKET_SIZE):
+                slotOffset = offset + i * SLOT.size
+                check, oldScore, oldDepth, oldBest = SLOT.unpack_from(self.map,
+                                                                      slotOffset)
+                if check == 0:
+                    if target is None:
+                        target = slotOffset
+                    continue
+                if _check(key, oldScore, oldDepth, oldBest) == check:
+                    if oldDepth > depth:
+                        return False
+                    target = slotOffset
+                    break
+                if shallowest is None or oldDepth < shallowest[1]:
+                    shallowest = (slotOffset, oldDepth)
+
+            if target is None:
+                if shallowest[1] > depth:
+                    return False
+                target = shallowest[0]
+
+            SLOT.pack_into(self.map, target, _check(key, score, depth, best),
+                           score, depth, best)
+            return True
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def close(self):
+        """A function to unmap and close the cache file.
+
+        :return: *None*
+        """
+        self.map.close()
+        os.close(self.fd)
@@ -0,0 +1,155 @@
+####################
+#  BitBoard Class  #
+####################
+# A board stored as two integers in the Board.key layout, for code that makes many moves
+# and only needs the moves, the valid columns, the winner and the key of each position.
+# It must behave exactly like Board for those; perft.py checks that it does.
+
+from engine import Board
+
+ROW_COUNT = Board.ROW_COUNT
+COL_COUNT = Board.COL_COUNT
+
+# Each column has ROW_COUNT + 1 bits, filled from the bottom, the extra bit stays empty
+COLUMN_BITS = ROW_COUNT + 1
+
+# Lowest and highest playable bit of each column
+BOTTOM = [1 << (col * COLUMN_BITS) for col in range(COL_COUNT)]
+TOP = [1 << (col * COLUMN_BITS + ROW_COUNT - 1) for col in range(COL_COUNT)]
+
+
+# A function to check a bitboard of one player's pieces for four in a row
+def has_four(pieces):
+    """A function to check a bitboard of one player's pieces for four in a row.
+
+    :param pieces: bits of the player's pieces in the :meth:`Board.Board.key` layout
+    :type pieces: int
+
+    :return: *True* if the pieces contain four in a row, *False* if not
+    :rtype: bool
+    """
+    # Shifts for vertical, horizontal and both diagonals
+    for shift in (1, COLUMN_BITS, COLUMN_BITS - 1, COLUMN_BITS + 1):
+        pairs = pieces & (pieces >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+# A function to build a bitboard from a string of moves
+def bitboard_from_moves(moves):
+    """A function to build a bitboard by replaying a string of moves from the empty board.
+
+    Moves are given as column digits numbered from 1 (e.g. ``"4453"``), with Player 1 moving first.
+
+    :param moves: string of column digits
+    :type moves: str
+
+    :raises:
+        **ValueError**: if a move is not a valid column, the column is full, or the game was already won
+
+    :return: bitboard after all moves have been made
+    :rtype: :class:`.BitBoard`
+    """
+    board = BitBoard()
+    for i, char in enumerate(moves):
+        if board.winner is not None:
+            raise ValueError("Move made after the game was won!")
+        if not char.isdigit() or not 1 <= int(char) <= COL_COUNT:
+            raise ValueError("Invalid Column: " + char)
+        col = int(char) - 1
+        if board.mask & TOP[col]:
+            raise ValueError("Column is full: " + char)
+        board = board.makeMove(col, (i % 2) + 1)
+    return board
+
+
+# A function to build a bitboard from a Board
+def bitboard_from_board(board):
+    """A function to build a bitboard of the same position as a :class:`Board.Board`.
+
+    :param board: Board instance
+    :type board: :class:`Board.Board`
+
+    :return: bitboard of the position
+    :rtype: :class:`.BitBoard`
+    """
+    mask = 0
+    player1 = 0
+    for col in range(COL_COUNT):
+        for row in range(ROW_COUNT):
+            value = board.matrix[ROW_COUNT - 1 - row][col]
+            if value == 0:
+                break
+            bit = 1 << (col * COLUMN_BITS + row)
+            mask |= bit
+            if value == 1:
+                player1 |= bit
+    return BitBoard(mask, player1, board.winner)
+
+
+class BitBoard:
+    """This class represents a connect4 board as bitmasks.
+
+        :param mask: bits of every piece, defaults to *0*
+        :type mask: int, *optional*
+        :param player1: bits of Player 1's pieces, defaults to *0*
+        :type player1: int, *optional*
+        :param winner: player who won the game, defaults to *None*
+        :type winner: int, *optional*
+
+        :Attributes:
+            * :mask (*int*): bits of every piece
+            * :player1 (*int*): bits of Player 1's pieces
+            * :winner (*int*): player who won the game, defaults to *None*
+    """
+
+    __slots__ = ("mask", "player1", "winner")
+
+    def __init__(self, mask=0, player1=0, winner=None):
+        """Constructor method."""
+        self.mask = mask
+        self.player1 = player1
+        self.winner = winner
+
+    # A function to return a unique integer key of the position
+    def key(self):
+        """A function to return the key of the position, equal to :meth:`Board.Board.key`.
+
+        :return: key of the position
+        :rtype: int
+        """
+        return self.mask + self.player1
+
+    def makeMove(self, col, playerValue):
+        """A function to make a move on the board in the given column for the given player value.
+
+        :param col: column position of position on board
+        :type col: int
+        :param playerValue: value of player
+        :type playerValue: int: 1 or 2
+
+        :return: new bitboard with move made, *None* if the column is full
+        :rtype: :class:`.BitBoard` or *None*
+        """
+        if self.mask & TOP[col]:
+            return None
+        # Adding the column's bottom bit carries up to the column's first empty bit
+        mask = self.mask | (self.mask + BOTTOM[col])
+        player1 = self.player1
+        if playerValue == 1:
+            player1 |= mask ^ self.mask
+            pieces = player1
+        else:
+            pieces = mask ^ player1
+        winner = playerValue if has_four(pieces) else self.winner
+        return BitBoard(mask, player1, winner)
+
+    # A function to return a list of valid col positions for moves
+    def get_valid_positions(self):
+        """A function to return a list of valid columns positions on board.
+
+        :return: list of valid columns on the board
+        :rtype: list of int values
+        """
+        return [col for col in range(COL_COUNT) if not self.mask & TOP[col]]
@@ -4,9 +4,84 @@
 
 import numpy as np
 
+import json
+import os
+
 ROW_COUNT = 6
 COL_COUNT = 7
 
+# Evaluation weights used by score_board and score_neighbors
+#   center: score per piece in the center column
+#   three / two: 3 or 2 pieces with the rest of the 4 unplayed
+#   opp_three: 3 opponent pieces with 1 unplayed
+#   win / loss: all 4 pieces belong to the player / the opponent
+DEFAULT_WEIGHTS = {
+    "center": 3,
+    "three": 5,
+    "two": 2,
+    "opp_three": -4,
+    "win": 100,
+    "loss": -100,
+}
+WEIGHTS = dict(DEFAULT_WEIGHTS)
+
+# Weights file in the project directory loaded at startup, unless another path is given in CONNECT4_WEIGHTS
+WEIGHTS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "weights.json")
+
+
+# A function to load evaluation weights from a JSON file
+def load_weights(path):
+    """A function to load evaluation weights from a JSON file into :data:`WEIGHTS`.
+
+    Weights missing from the file keep their current values.
+
+    :param path: path of a JSON object mapping weight names to numbers
+    :type path: str
+
+    :raises:
+        **ValueError**: if the file contains an unknown weight name
+
+    :return: the updated weights
+    :rtype: dict
+    """
+    with open(path) as f:
+        weights = json.load(f)
+    for name in weights:
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError("Unknown Weight: " + name)
+    WEIGHTS.update(weights)
+    return WEIGHTS
+
+
+# A function to build a board from a string of moves
+def board_from_moves(moves):
+    """A function to build a board by replaying a string of moves from the empty board.
+
+    Moves are given as column digits numbered from 1 (e.g. ``"4453"``), with Player 1 moving first.
+
+    :param moves: string of column digits
+    :type moves: str
+
+    :raises:
+        **ValueError**: if a move is not a valid column, the column is full, or the game was already won
+
+    :return: board after all moves have been made
+    :rtype: :class:`.Board`
+    """
+    board = Board()
+    for i, char in enumerate(moves):
+        if board.winner is not None:
+            raise ValueError("Move made after the game was won!")
+        if not char.isdigit() or not 1 <= int(char) <= COL_COUNT:
+            raise ValueError("Invalid Column: " + char)
+        col = int(char) - 1
+        if board.isValidMove(col) is None:
+            raise ValueError("Column is full: " + char)
+        board = board.makeMove(col, (i % 2) + 1)
+    return board
+
 
 class Board:
     """This class represents the actual connect4 board the game is played on.
@@ -61,7 +136,53 @@ class Board:
         """
         if not isinstance(other, Board):
             return False
-        return self.matrix == other.matrix
+        return bool(np.array_equal(self.matrix, other.matrix))
+
+    # A function to hash the Board, consistent with __eq__
+    def __hash__(self):
+        """A function to hash the Board, so equal boards have equal hashes.
+
+            :return: hash of the position
+            :rtype: int
+        """
+        return hash(self.key())
+
+    # A function to return a unique integer key of the position
+    def key(self, mirror=False):
+        """A function to return a unique integer key of the position on the board.
+
+        Each column takes ROW_COUNT + 1 bits, filled from the bottom. The key is the sum of a
+        mask with a bit set for every piece and a mask with a bit set for every Player 1 piece,
+        which is unique for every position reachable in a game and fits in 49 bits.
+
+        :param mirror: *True* for the key of the board mirrored left to right, defaults to *False*
+        :type mirror: bool, optional
+
+        :return: key of the position
+        :rtype: int
+        """
+        mask = 0
+        player1 = 0
+        for col in range(COL_COUNT):
+            keyCol = COL_COUNT - 1 - col if mirror else col
+            for row in range(ROW_COUNT):
+                value = self.matrix[ROW_COUNT - 1 - row][col]
+                if value == 0:
+                    break
+                bit = 1 << (keyCol * (ROW_COUNT + 1) + row)
+                mask |= bit
+                if value == 1:
+                    player1 |= bit
+        return mask + player1
+
+    # A function to return the key shared by a position and its mirror image
+    def canonical_key(self):
+        """A function to return the key shared by a position and its left to right mirror image.
+
+        :return: the smaller of the position's key and its mirrored key
+        :rtype: int
+        """
+        return min(self.key(), self.key(mirror=True))
 
     # A function to check if the move is valid
     def isValidMove(self, col):
@@ -226,64 +347,84 @@ class Board:
             :return: final point (row,col) of winning streak, *None* if no win state is achieved
             :rtype: (int,int) tuple or *None*
         """
-        row, col = point
         # Verify point is valid
         if point is None:
             return None
 
-        # A tail recursive helper function
-        def win_state_helper(winningPt, streak=2):
-            """A tail recursive helper function for method:'win_state'.
-
-            :param winningPt: (point,position) tuple
-            :type winningPt: ( (int,int), int )
-            :param streak: current streak of common neighboring values, defaults to 'streak=2'
-            :type streak: int, optional
+        playerVal = self.matrix[point[0]][point[1]]
+
+        # Each line through point is walked in both directions, so that a move
+        # filling a gap in the middle of a streak is also a win.
+        # (forward, backward) neighbor positions: horizontal, vertical, both diagonals
+        for forward, backward in ((4, 3), (6, 1), (7, 0), (5, 2)):
+            streak = 1
+            end = point
+            for position in (forward, backward):
+                neighbor = self.neighbors(point, position)
+                while neighbor is not None:
+                    nR, nC = neighbor
+                    if self.matrix[nR][nC] != playerVal:
+                        break
+                    streak += 1
+                    if position == forward:
+                        end = neighbor
+                    neighbor = self.neighbors(neighbor, position)
+            if streak >= 4:
+                return end
+        return None
 
-            :return: final point of 4-point streak, *None* if streak less than 4
-            :rtype: (int,int) tuple or *None*
-            """
+    # A function to check if a player would win by playing on a given point
+    def is_winning_square(self, point, playerValue):
+        """A function to check if a player would win by placing a piece on a given empty point.
 
-            point, position = winningPt
-            row, col = point
+            :param point: valid (row,col) position on board
+            :type point: (int,int) tuple
+            :param playerValue: value of player, used for coloring pieces
+            :type playerValue: int: 1 or 2
 
-            neighbor = self.neighbors(point, position)
-            if neighbor is not None:
-                nR, nC = neighbor
-                if self.matrix[nR][nC] == self.matrix[row][col]:
-                    streak += 1
-                    if streak == 4:
-                        return neighbor
-                    return win_state_helper((neighbor, position), (streak))
-            return None
+            :return: *True* if a piece on point would win the game, *False* if not
+            :rtype: bool
+        """
+        row, col = point
+        # Place the piece temporarily rather than duplicating the board
+        self.matrix[row][col] = playerValue
+        winning = self.win_state(point) is not None
+        self.matrix[row][col] = 0
+        return winning
 
-        playerVal = self.matrix[row][col]
+    # A function to return the columns a player can win in with their next move
+    def winning_moves(self, playerValue):
+        """A function to return the columns a player can win in with their next move.
 
-        for i in range(COL_COUNT + 1):
-            neighbor = self.neighbors(point, i)
-            if neighbor is None:
-                continue
+            :param playerValue: value of player, used for coloring pieces
+            :type playerValue: int: 1 or 2
 
-            nR, nC = neighbor
-            neighborVal = self.matrix[nR][nC]
-            if neighborVal == playerVal:
-                helper = win_state_helper((neighbor, i))
-                if helper is not None:
-                    return helper
-        return None
+            :return: list of winning columns
+            :rtype: list of int values
+        """
+        wins = []
+        for col in self.get_valid_positions():
+            if self.is_winning_square((self.isValidMove(col), col), playerValue):
+                wins.append(col)
+        return wins
 
     # A function to score a list of 4 neighboring points
-    def score_neighbors(self, neighbors, playerValue):
+    def score_neighbors(self, neighbors, playerValue, weights=None):
         """A function to score a list of 4 neighboring points.
 
         :param neighbors: 4 points in a row
         :type neighbors: list
         :param playerValue: value of player, used for coloring pieces
         :type playerValue: int: 1 or 2
+        :param weights: evaluation weights, defaults to :data:`WEIGHTS`
+        :type weights: dict, optional
 
         :returns: score for the given points
         :rtype: int
         """
+        if weights is None:
+            weights = WEIGHTS
+
         score = 0
 
         oppValue = 2
@@ -292,38 +433,43 @@ class Board:
 
         # If all 4 pieces are = playerValue, score is increased by 100
         if neighbors.count(playerValue) == 4:
-            score += 100
+            score += weights["win"]
             self.winner = playerValue
 
         # If 3 pieces are playerValue and one piece is unplayed, score += 5
         if neighbors.count(playerValue) == 3 and neighbors.count(0) == 1:
-            score += 5
+            score += weights["three"]
 
         # If 2 pieces are playerValue and 2 pieces are unplayed, score += 2
         if neighbors.count(playerValue) == 2 and neighbors.count(0) == 2:
-            score += 2
+            score += weights["two"]
 
         # If 3 pieces are oppValue and 1 piece is unplayed, score -= 4
         if neighbors.count(oppValue) == 3 and neighbors.count(0) == 1:
-            score -= 4
+            score += weights["opp_three"]
 
         # If opponent won game, score -= 100
         if neighbors.count(oppValue) == 4:
-            score -= 100
+            score += weights["loss"]
             self.winner = oppValue
 
         return score
 
     # A function to score the board for a given playerValue for minimax
-    def score_board(self, playerValue):
+    def score_board(self, playerValue, weights=None):
         """ A function to score the board for a given player.
             
         :param playerValue: value of player, used for coloring pieces
         :type playerValue: int: 1 or 2
+        :param weights: evaluation weights, defaults to :data:`WEIGHTS`
+        :type weights: dict, optional
             
         :return: score of board for given playerValue
         :rtype: int     
         """
+        if weights is None:
+            weights = WEIGHTS
+
         # Number of pieces in a row needed to win
         WIN_PIECE_COUNT = 4
 
@@ -333,7 +479,7 @@ class Board:
         score = 0
 
         # Score multiplier for center board position
-        CENTER_PIECE_MULTIPLIER = 3
+        CENTER_PIECE_MULTIPLIER = weights["center"]
 
         # Positions in the center of the board are more advantagous
 
@@ -348,7 +494,8 @@ class Board:
             # Remove 3 from col count since 3rd to last col will check up to last column
             for col in range(COL_COUNT - 3):
                 next_4_neighbors = row_values[col:col + WIN_PIECE_COUNT]
-                score += self.score_neighbors(next_4_neighbors, playerValue)
+                score += self.score_neighbors(next_4_neighbors, playerValue,
+                                              weights)
 
         ## Score Vertical
         for col in range(COL_COUNT):
@@ -356,7 +503,8 @@ class Board:
             # Remove 3 from row count since 3rd to last row will check up to last row
             for row in range(ROW_COUNT - 3):
                 next_4_neighbors = col_values[row:row + WIN_PIECE_COUNT]
-                score += self.score_neighbors(next_4_neighbors, playerValue)
+                score += self.score_neighbors(next_4_neighbors, playerValue,
+                                              weights)
 
         ## Score Positive Diagonal
         for row in range(ROW_COUNT - 3):
@@ -365,7 +513,8 @@ class Board:
                     board_array[row + i][col + i]
                     for i in range(WIN_PIECE_COUNT)
                 ]
-                score += self.score_neighbors(next_4_neighbors, playerValue)
+                score += self.score_neighbors(next_4_neighbors, playerValue,
+                                              weights)
 
         ## Score Negative Diagonal
         for row in range(ROW_COUNT - 3):
@@ -374,7 +523,8 @@ class Board:
                     self.matrix[row + 3 - i][col + i]
                     for i in range(WIN_PIECE_COUNT)
                 ]
-                score += self.score_neighbors(next_4_neighbors, playerValue)
+                score += self.score_neighbors(next_4_neighbors, playerValue,
+                                              weights)
 
         return score
 
@@ -427,3 +577,10 @@ class Board:
                     s += " | " + str(int(self.matrix[row][col]))
             s += ' ||       [' + str(row) + "]\n\n"
         return s + '\n\n'
+
+
+# Tuned weights are loaded at startup when a weights file exists
+if os.environ.get("CONNECT4_WEIGHTS"):
+    load_weights(os.environ["CONNECT4_WEIGHTS"])
+elif os.path.exists(WEIGHTS_FILE):
+    load_weights(WEIGHTS_FILE)
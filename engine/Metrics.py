@@ -0,0 +1,204 @@
+####################
+#  Move Metrics    #
+####################
+# Always-on latency histograms of engine moves, kept per (player type, depth, game phase)
+# with the number of moves, total seconds and total nodes searched. Recording a move is a
+# dict lookup, a bisect over the bucket bounds and a few additions, so it stays on in
+# every game loop. Player.get_col_move records into METRICS.
+#
+# Snapshots are written as Prometheus text, or as JSON if the path ends in .json,
+# either on demand or every few seconds from a background thread (see Exporter).
+
+import bisect
+import json
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the latency buckets, the last bucket has no bound
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0]
+
+# Game phases by number of pieces on the board: up to the bound, the phase applies
+PHASES = [(12, "opening"), (28, "middlegame"), (42, "endgame")]
+
+# Names of player types in exported labels
+PLAYER_TYPE_NAMES = {
+    0: "user",
+    1: "random",
+    2: "minimax",
+    3: "pvs",
+    4: "valuenet",
+    5: "bestfirst",
+}
+
+
+# A function to return the game phase of a move
+def phase(pieces):
+    """A function to return the game phase for a number of pieces on the board.
+
+    :param pieces: number of pieces on the board before the move
+    :type pieces: int
+
+    :return: "opening", "middlegame" or "endgame"
+    :rtype: str
+    """
+    for bound, name in PHASES:
+        if pieces <= bound:
+            return name
+    return PHASES[-1][1]
+
+
+class MoveMetrics:
+    """This class holds the latency histograms of engine moves.
+
+    :Attributes:
+        * :series (*dict*): [bucket counts, moves, seconds, nodes] for each (player type, depth, phase)
+        * :started (*float*): time the metrics were created, as time.time()
+    """
+
+    def __init__(self):
+        """Constructor Method."""
+        self.series = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    # A function to record one move
+    def observe(self, playerType, depth, pieces, seconds, nodes=0):
+        """A function to record the latency of one move.
+
+        :param playerType: type of the Player that moved
+        :type playerType: int
+        :param depth: search depth of the Player
+        :type depth: int
+        :param pieces: number of pieces on the board before the move
+        :type pieces: int
+        :param seconds: time taken to choose the move
+        :type seconds: float
+        :param nodes: number of nodes searched, defaults to *0*
+        :type nodes: int, optional
+
+        :return: *None*
+        """
+        key = (playerType, depth, phase(pieces))
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self.lock:
+            entry = self.series.get(key)
+            if entry is None:
+                entry = [[0] * (len(LATENCY_BUCKETS) + 1), 0, 0.0, 0]
+                self.series[key] = entry
+            entry[0][bucket] += 1
+            entry[1] += 1
+            entry[2] += seconds
+            entry[3] += nodes
+
+    # A function to return a copy of the histograms
+    def snapshot(self):
+        """A function to return a JSON serializable copy of the histograms.
+
+        :return: time of the snapshot, start time, and one entry per series with its labels,
+                 bucket bounds and counts (not cumulative), moves, seconds and nodes
+        :rtype: dict
+        """
+        with self.lock:
+            items = [(key, list(entry[0]), entry[1], entry[2], entry[3])
+                     for key, entry in self.series.items()]
+        series = []
+        for (playerType, depth, phaseName), counts, moves, seconds, nodes in sorted(items):
+            series.append({
+                "player_type": PLAYER_TYPE_NAMES.get(playerType, str(playerType)),
+                "depth": depth,
+                "phase": phaseName,
+                "buckets": LATENCY_BUCKETS + ["+Inf"],
+                "counts": counts,
+                "moves": moves,
+                "seconds": seconds,
+                "nodes": nodes,
+            })
+        return {"time": time.time(), "started": self.started, "series": series}
+
+    # A function to format the histograms as Prometheus text
+    def prometheus_text(self):
+        """A function to format the histograms in the Prometheus text exposition format.
+
+        :return: connect4_move_seconds histograms and connect4_move_nodes_total counters
+        :rtype: str
+        """
+        snapshot = self.snapshot()
+        lines = ["# HELP connect4_move_seconds Time taken to choose an engine move.",
+                 "# TYPE connect4_move_seconds histogram"]
+        for entry in snapshot["series"]:
+            labels = (f'player_type="{entry["player_type"]}",'
+                      f'depth="{entry["depth"]}",phase="{entry["phase"]}"')
+            total = 0
+            for bound, count in zip(entry["buckets"], entry["counts"]):
+                total += count
+                lines.append(f'connect4_move_seconds_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f"connect4_move_seconds_sum{{{labels}}} {entry['seconds']}")
+            lines.append(f"connect4_move_seconds_count{{{labels}}} {entry['moves']}")
+        lines += ["# HELP connect4_move_nodes_total Nodes searched to choose engine moves.",
+                  "# TYPE connect4_move_nodes_total counter"]
+        for entry in snapshot["series"]:
+            labels = (f'player_type="{entry["player_type"]}",'
+                      f'depth="{entry["depth"]}",phase="{entry["phase"]}"')
+            lines.append(f"connect4_move_nodes_total{{{labels}}} {entry['nodes']}")
+        return "\n".join(lines) + "\n"
+
+    # A function to write a snapshot to a file
+    def write(self, path):
+        """A function to write a snapshot, as JSON if path ends in .json and as Prometheus text otherwise.
+
+        The file is replaced atomically, so readers never see a partial snapshot.
+
+        :param path: path of the file
+        :type path: str
+
+        :return: *None*
+        """
+        if path.endswith(".json"):
+            text = json.dumps(self.snapshot(), indent=1)
+        else:
+            text = self.prometheus_text()
+        tempPath = path + ".tmp"
+        with open(tempPath, "w") as f:
+            f.write(text)
+        os.replace(tempPath, path)
+
+
+class Exporter:
+    """This class writes snapshots of metrics to a file every few seconds from a background thread.
+
+    :param metrics: metrics to export
+    :type metrics: :class:`.MoveMetrics`
+    :param path: path of the file, see :meth:`MoveMetrics.write`
+    :type path: str
+    :param interval: seconds between snapshots
+    :type interval: float
+    """
+
+    def __init__(self, metrics, path, interval):
+        """Constructor Method."""
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopEvent = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # A function run on the background thread
+    def _run(self):
+        while not self.stopEvent.wait(self.interval):
+            self.metrics.write(self.path)
+
+    def stop(self):
+        """A function to stop the background thread and write a final snapshot.
+
+        :return: *None*
+        """
+        self.stopEvent.set()
+        self.thread.join()
+        self.metrics.write(self.path)
+
+
+# Metrics recorded by Player.get_col_move
+METRICS = MoveMetrics()
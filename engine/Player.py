@@ -0,0 +1,881 @@
+####################
+#   Player Class   #
+####################
+# Holds all methods and packages related to automated player actions
+from engine import BitBoard, Metrics, State, ValueNet
+
+import heapq
+import random
+import math
+import time
+
+import numpy as np
+
+# Score of a won board, matches the value minimax returns for wins
+WIN_SCORE = 100000000000000
+
+# Column search order, center columns first since they are usually the strongest moves
+MOVE_ORDER = [3, 2, 4, 1, 5, 0, 6]
+
+# Half width of the aspiration window around the previous iteration's score
+ASPIRATION_WINDOW = 10
+# Aspiration windows wider than this are opened up to a full window
+ASPIRATION_LIMIT = 1000
+
+# Late move reductions: moves from this index on are searched one ply shallower
+LMR_MOVE_INDEX = 3
+# Late move reductions are only applied with at least this much depth left
+LMR_MIN_DEPTH = 3
+
+# Most States the best-first search keeps in memory at once
+BEST_FIRST_NODES = 20000
+# Fraction of BEST_FIRST_NODES left after forgetting the least promising nodes
+BEST_FIRST_KEEP = 0.75
+
+# Player types that search to their depth, the others are recorded with depth 0
+SEARCH_TYPES = (2, 3, 4, 5)
+
+# Status of best-first search nodes: not yet searched, value known, dropped
+LIVE = 0
+SOLVED = 1
+PURGED = 2
+
+
+class SearchStopped(Exception):
+    """Raised inside a search when the Player's stopEvent is set."""
+
+
+class Player:
+    """This class encompases the Player object which handles the logic of automated player actions.
+    
+    :param playerType: type of Player (1: Random, 2: Minimax, 3: Principal Variation Search, 4: Value Network, 5: Best-First Search)
+    :type playerType: int
+    :param playerValue: number of Player (1 or 2)
+    :param depth: search depth of searching player types, defaults to *5*
+    :type depth: int, optional
+    :param weights: evaluation weights passed to :meth:`Board.Board.score_board`, defaults to *None* (the loaded weights)
+    :type weights: dict, optional
+    :param cache: analysis cache consulted before searching, defaults to *None*
+    :type cache: :class:`AnalysisCache.AnalysisCache`, optional
+    :param net: value network of the Value Network player type, defaults to *None* (the default network)
+    :type net: :class:`ValueNet.ValueNet`, optional
+    :param maxNodes: most States the Best-First Search player type keeps in memory, defaults to :data:`BEST_FIRST_NODES`
+    :type maxNodes: int, optional
+
+    :raises:
+        **ValueError**: if the cache was created with other evaluation weights than the Player's
+
+
+    :Attributes:
+        * :type (*int*): Player type (1: Random, 2: Minimax, 3: Principal Variation Search, 4: Value Network, 5: Best-First Search)
+        * :playerValue (*int*): number of Player (1 or 2)
+        * :oppValue (*int*): number of opposing Player (1 or 2)
+        * :depth (*int*): search depth of searching player types
+        * :weights (*dict*): evaluation weights, *None* for the loaded weights
+        * :cache (:class:`AnalysisCache.AnalysisCache`): analysis cache, *None* for no cache
+        * :net (:class:`ValueNet.ValueNet`): value network, *None* for the default network
+        * :maxNodes (*int*): most States the best-first search keeps in memory
+        * :pool (:class:`State.StatePool`): States reused by the best-first search
+        * :nodes (*int*): number of nodes visited by the last search
+        * :stopEvent (*threading.Event*): event that interrupts :meth:`minimax`, :meth:`search` and :meth:`best_first` when set, defaults to *None*
+    """
+
+    # A Dictionary to hold strings for playerType, will be used for __str__
+    playerTypeStrings = {
+        0: "User Input",
+        1: "Random",
+        2: "Minimax",
+        3: "Principal Variation Search",
+        4: "Value Network",
+        5: "Best-First Search",
+        6: "{ToBeImplimentedLater}"
+    }
+
+    # A function to initlizie the player
+    def __init__(self, playerType, playerValue, depth=5, weights=None,
+                 cache=None, net=None, maxNodes=BEST_FIRST_NODES):
+        """Constructor Method."""
+        # Scores computed with other weights would be mixed into the cache and read back
+        if cache is not None and not cache.matches(weights):
+            raise ValueError("Analysis cache was written with other evaluation weights")
+        self.type = playerType
+        self.playerValue = playerValue
+        self.depth = depth
+        self.weights = weights
+        self.cache = cache
+        self.net = net
+        self.maxNodes = maxNodes
+        self.pool = State.StatePool()
+
+        if self.playerValue == 1:
+            self.oppValue = 2
+        else:
+            self.oppValue = 1
+
+        self.nodes = 0
+        self.stopEvent = None
+
+    # A function to represent the player instance as a string
+    def __str__(self):
+        """A function to represent a Player instance as a String.
+        
+        :return: *None*
+        """
+        pass
+
+    # Random_Col will be used when playerType = 1 ("Random" player type)
+    # A function to return a random column in the given state's board
+    def random_col(self, state):
+        """A function to return a random valid column in the given state's board.
+
+        :param state: State instance
+        :type state: :class:`State.State`
+
+        :return: random valid column on board
+        :rtype: int
+        """
+        return random.choice(state.board.get_valid_positions())
+
+    # A function to get the best move for minimax based on state and self.playerValue
+    def minimax(self, board, depth, alpha, beta, maximizingPlayer):
+        """A function to get the best move for minimax player.
+
+        :param self: Player instance
+        :type self: :class:`Player.Player`
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param alpha: alpha value
+        :type alpha: int
+        :param beta: beta value 
+        :type beta: int
+        :param maximizingPlayer: *True* if player is maximizing player, *False* if player is minimizing player
+        :type maximizingPlayer: bool
+
+        :raises:
+            **SearchStopped**: if stopEvent is set during the search
+
+        :return: column - int location of best column move for minimax player
+                 value - score of board for move in returned column
+        :rtype: (column,value) tuple
+        """
+        self.nodes += 1
+        if self.stopEvent is not None and self.stopEvent.is_set():
+            raise SearchStopped()
+
+        # If depth is 0, return score of board
+        if depth == 0:
+            return (None, board.score_board(self.playerValue, self.weights))
+
+        if maximizingPlayer:
+            valid_positions = self.filter_moves(board, self.playerValue)
+        else:
+            valid_positions = self.filter_moves(board, self.oppValue)
+
+        ## Maximizing Player
+        if maximizingPlayer:
+            value = -math.inf
+            column = None
+            for col in valid_positions:
+                moveBoard = board.makeMove(col, self.playerValue)
+                if moveBoard is None:
+                    continue
+
+                if moveBoard.winner == self.playerValue:
+                    return (col, 100000000000000)
+                elif moveBoard.winner == self.oppValue:
+                    return (col, -100000000000000)
+
+                moveBoard_score = self.minimax(moveBoard, (depth - 1), alpha,
+                                               beta, False)[1]
+                if moveBoard_score > value:
+                    value = moveBoard_score
+                    column = col
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+
+            return column, value
+
+        ## Minimizing Player
+        else:
+            value = math.inf
+            column = None
+            for col in valid_positions:
+                moveBoard = board.makeMove(col, self.oppValue)
+                if moveBoard is None:
+                    continue
+
+                if moveBoard.winner == self.playerValue:
+                    return (col, 100000000000000)
+                elif moveBoard.winner == self.oppValue:
+                    return (col, -100000000000000)
+
+                moveBoard_score = self.minimax(moveBoard, (depth - 1), alpha,
+                                               beta, True)[1]
+                if moveBoard_score < value:
+                    value = moveBoard_score
+                    column = col
+                beta = min(beta, value)
+                if alpha >= beta:
+                    break
+
+            return column, value
+
+    # A function to return the valid columns of a board in search order
+    def ordered_moves(self, board, first=None):
+        """A function to return the valid columns of a board, center columns first.
+
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param first: column to search before all others, defaults to *None*
+        :type first: int, optional
+
+        :return: valid columns in search order
+        :rtype: list of int values
+        """
+        valid_positions = board.get_valid_positions()
+        moves = [col for col in MOVE_ORDER if col in valid_positions]
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    # A function to drop moves that lose immediately, or play a forced win or block
+    def filter_moves(self, board, sideValue, moves=None):
+        """A function to narrow the moves of a board using immediate threats.
+
+        If the player to move can win, only the winning move is returned. If the opponent
+        threatens to win, only the block is returned. Otherwise moves directly under an
+        opponent's winning square are dropped, unless every move is.
+
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param sideValue: number of the player to move (1 or 2)
+        :type sideValue: int
+        :param moves: columns to filter, in search order, defaults to all valid columns
+        :type moves: list, optional
+
+        :return: columns worth searching, in the given order
+        :rtype: list of int values
+        """
+        if moves is None:
+            moves = board.get_valid_positions()
+
+        wins = board.winning_moves(sideValue)
+        if wins:
+            return wins[:1]
+
+        oppValue = 1 if sideValue == 2 else 2
+        threats = board.winning_moves(oppValue)
+        # With two threats the game is lost, so blocking either one is as good as any move
+        if threats:
+            return threats[:1]
+
+        safe_moves = []
+        for col in moves:
+            row = board.isValidMove(col)
+            if row == 0:
+                safe_moves.append(col)
+                continue
+            # Place the piece temporarily to see if it gives the opponent the square above
+            board.matrix[row][col] = sideValue
+            if not board.is_winning_square((row - 1, col), oppValue):
+                safe_moves.append(col)
+            board.matrix[row][col] = 0
+
+        if safe_moves:
+            return safe_moves
+        return moves
+
+    # A function to score a board from the point of view of the player to move
+    def evaluate(self, board, sideValue):
+        """A function to score a board for negamax, from the point of view of the player to move.
+
+        The board is always scored for self.playerValue, like :meth:`minimax`, and negated
+        when the opponent is to move, so both searches see the same leaf values.
+
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param sideValue: number of the player to move (1 or 2)
+        :type sideValue: int
+
+        :return: score of board for the player to move
+        :rtype: int
+        """
+        score = board.score_board(self.playerValue, self.weights)
+        if sideValue == self.playerValue:
+            return score
+        return -score
+
+    # A function to search a board with negamax principal variation search
+    def pvs(self, board, depth, alpha, beta, sideValue, ply=1):
+        """A function to get the negamax score of a board with principal variation search.
+
+        The first move is searched with the full window and the rest with a null window,
+        re-searching only when a move fails high. Late moves are searched one ply shallower
+        and re-searched at full depth if they turn out to be good.
+
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param depth: depth left to search
+        :type depth: int
+        :param alpha: alpha value
+        :type alpha: int
+        :param beta: beta value
+        :type beta: int
+        :param sideValue: number of the player to move (1 or 2)
+        :type sideValue: int
+        :param ply: number of moves made since the root, defaults to *1*
+        :type ply: int, optional
+
+        :raises:
+            **SearchStopped**: if stopEvent is set during the search
+
+        :return: score of board for the player to move
+        :rtype: int
+        """
+        self.nodes += 1
+        if self.stopEvent is not None and self.stopEvent.is_set():
+            raise SearchStopped()
+
+        if depth == 0:
+            return self.evaluate(board, sideValue)
+
+        moves = self.ordered_moves(board)
+        # A full board without a winner is a draw
+        if not moves:
+            return 0
+
+        moves = self.filter_moves(board, sideValue, moves)
+
+        nextValue = 1 if sideValue == 2 else 2
+        for index, col in enumerate(moves):
+            moveBoard = board.makeMove(col, sideValue)
+            # Winning sooner is better than winning later
+            if moveBoard.winner == sideValue:
+                return WIN_SCORE - ply
+
+            if index == 0:
+                score = -self.pvs(moveBoard, depth - 1, -beta, -alpha,
+                                  nextValue, ply + 1)
+            else:
+                reduction = 0
+                if index >= LMR_MOVE_INDEX and depth >= LMR_MIN_DEPTH:
+                    reduction = 1
+                score = -self.pvs(moveBoard, depth - 1 - reduction,
+                                  -alpha - 1, -alpha, nextValue, ply + 1)
+                # A reduced move that beats alpha is searched again at full depth
+                if reduction and score > alpha:
+                    score = -self.pvs(moveBoard, depth - 1, -alpha - 1,
+                                      -alpha, nextValue, ply + 1)
+                # A move that beats alpha inside the window is searched again with the full window
+                if alpha < score < beta:
+                    score = -self.pvs(moveBoard, depth - 1, -beta, -alpha,
+                                      nextValue, ply + 1)
+
+            if score >= beta:
+                return beta
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    # A function to search the root of a board with principal variation search
+    def pvs_root(self, board, depth, alpha, beta, first=None):
+        """A function to get the best column and score of a board with principal variation search.
+
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param depth: depth to search
+        :type depth: int
+        :param alpha: alpha value
+        :type alpha: int
+        :param beta: beta value
+        :type beta: int
+        :param first: column to search first, defaults to *None*
+        :type first: int, optional
+
+        :return: column - int location of best column move, value - score of the search
+        :rtype: (column,value) tuple
+        """
+        self.nodes += 1
+        column = None
+        moves = self.filter_moves(board, self.playerValue,
+                                  self.ordered_moves(board, first))
+        for index, col in enumerate(moves):
+            moveBoard = board.makeMove(col, self.playerValue)
+            if moveBoard.winner == self.playerValue:
+                return col, WIN_SCORE
+
+            if index == 0:
+                score = -self.pvs(moveBoard, depth - 1, -beta, -alpha,
+                                  self.oppValue)
+            else:
+                score = -self.pvs(moveBoard, depth - 1, -alpha - 1, -alpha,
+                                  self.oppValue)
+                if alpha < score < beta:
+                    score = -self.pvs(moveBoard, depth - 1, -beta, -alpha,
+                                      self.oppValue)
+
+            if column is None or score > alpha:
+                column = col
+            if score >= beta:
+                return column, beta
+            if score > alpha:
+                alpha = score
+
+        return column, alpha
+
+    # A function to get the best move with iterative deepening and aspiration windows
+    def search(self, board, depth, callback=None, start=None):
+        """A function to get the best move by iterative deepening principal variation search.
+
+        Each iteration after the first searches a narrow aspiration window around the previous
+        score, and widens the window on the failing side until the score falls inside it.
+        Given the result of an earlier search of the board, iterations continue from its depth.
+
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param depth: maximum depth to search
+        :type depth: int
+        :param callback: function called with (depth, column, value) after each iteration, defaults to *None*
+        :type callback: function, optional
+        :param start: (depth, column, value) of an earlier search of the board, defaults to *None*
+        :type start: tuple, optional
+
+        :raises:
+            **SearchStopped**: if stopEvent is set during the search
+
+        :return: column - int location of best column move, value - score of the search
+        :rtype: (column,value) tuple
+        """
+        self.nodes = 0
+        if start is None:
+            startDepth = 1
+            column, value = self.pvs_root(board, 1, -math.inf, math.inf)
+            if callback is not None:
+                callback(1, column, value)
+        else:
+            startDepth, column, value = start
+        for iterDepth in range(startDepth + 1, depth + 1):
+            # Wins are exact, so there is nothing left to search for
+            if abs(value) >= WIN_SCORE - depth:
+                break
+
+            window = ASPIRATION_WINDOW
+            alpha = value - window
+            beta = value + window
+            while True:
+                col, score = self.pvs_root(board, iterDepth, alpha, beta,
+                                           column)
+                if alpha < score < beta:
+                    break
+                # Widen the failing side, and open it fully once it is wider than heuristic scores get
+                window *= 4
+                if score <= alpha:
+                    alpha = value - window if window < ASPIRATION_LIMIT else -math.inf
+                else:
+                    column = col
+                    beta = value + window if window < ASPIRATION_LIMIT else math.inf
+            column, value = col, score
+            if callback is not None:
+                callback(iterDepth, column, value)
+
+        return column, value
+
+    # A function to collect the frontier positions of a full width search
+    def collect_leaves(self, board, depth, sideValue, leaves):
+        """A function to collect the positions at the given depth below a board, in search order.
+
+        Won positions are not played on, and once a move wins no later moves of that node are
+        searched, exactly as :meth:`backup_leaves` walks the tree.
+
+        :param board: BitBoard instance
+        :type board: :class:`BitBoard.BitBoard`
+        :param depth: depth left to search
+        :type depth: int
+        :param sideValue: number of the player to move (1 or 2)
+        :type sideValue: int
+        :param leaves: list the frontier positions are appended to
+        :type leaves: list
+
+        :return: *None*
+        """
+        if depth == 0:
+            leaves.append(board)
+            return
+        for col in self.ordered_moves(board):
+            moveBoard = board.makeMove(col, sideValue)
+            if moveBoard.winner is not None:
+                return
+            self.collect_leaves(moveBoard, depth - 1, 3 - sideValue, leaves)
+
+    # A function to back up evaluated frontier positions with negamax
+    def backup_leaves(self, board, depth, sideValue, values, ply=1):
+        """A function to get the negamax score of a board from the values of its frontier positions.
+
+        :param board: BitBoard instance
+        :type board: :class:`BitBoard.BitBoard`
+        :param depth: depth left to search
+        :type depth: int
+        :param sideValue: number of the player to move (1 or 2)
+        :type sideValue: int
+        :param values: iterator over the values of the positions from :meth:`collect_leaves`, in the same order
+        :type values: iterator
+        :param ply: number of moves made since the root, defaults to *1*
+        :type ply: int, optional
+
+        :return: column - int location of best column move, value - score of board for the player to move
+        :rtype: (column,value) tuple
+        """
+        self.nodes += 1
+        if depth == 0:
+            return None, next(values)
+
+        column = None
+        value = -math.inf
+        for col in self.ordered_moves(board):
+            moveBoard = board.makeMove(col, sideValue)
+            if moveBoard.winner is not None:
+                return col, WIN_SCORE - ply
+            score = -self.backup_leaves(moveBoard, depth - 1, 3 - sideValue,
+                                        values, ply + 1)[1]
+            if score > value:
+                value = score
+                column = col
+
+        # A full board is a draw
+        if column is None:
+            return None, 0
+        return column, value
+
+    # A function to get the best move using the value network on batches of frontier positions
+    def batch_search(self, board, depth, batchSize=ValueNet.BATCH_SIZE):
+        """A function to get the best move by a full width search scored by the value network.
+
+        All frontier positions are collected first and evaluated batchSize at a time with
+        one matrix multiply per layer, then their values are backed up with negamax.
+
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param depth: depth to search
+        :type depth: int
+        :param batchSize: positions per network batch, defaults to :data:`ValueNet.BATCH_SIZE`
+        :type batchSize: int, optional
+
+        :raises:
+            **FileNotFoundError**: if the player has no network and there is no default network
+
+        :return: column - int location of best column move, value - score of the search
+        :rtype: (column,value) tuple
+        """
+        net = self.net if self.net is not None else ValueNet.default_net()
+        root = BitBoard.bitboard_from_board(board)
+        self.nodes = 0
+
+        leaves = []
+        self.collect_leaves(root, depth, self.playerValue, leaves)
+        leafValue = self.playerValue if depth % 2 == 0 else self.oppValue
+        values = []
+        if leaves:
+            values = net.evaluate_bitboards(leaves, leafValue, batchSize).tolist()
+        return self.backup_leaves(root, depth, self.playerValue, iter(values))
+
+    # A function to create a best-first search node
+    def _node(self, board, parent, depth, col):
+        node = self.pool.acquire(board, parent, depth)
+        # Creation order breaks ties between equally promising nodes when forgetting
+        self.serial += 1
+        node.serial = self.serial
+        node.status = LIVE
+        node.col = col
+        node.children = []
+        node.forgotten = {}
+        node.moves = None
+        node.best = None
+        node.inOpen = False
+        if parent is not None:
+            parent.children.append(node)
+        return node
+
+    # A function to add a best-first search node to the open heap with upper bound h
+    def _push(self, opened, node, h):
+        node.fvalue = -h
+        node.inOpen = True
+        heapq.heappush(opened, self._entry(node))
+
+    # A function to return the open heap entry of a best-first search node
+    def _entry(self, node):
+        # Equal bounds are searched deepest first, then in creation order, like the left
+        # to right order of SSS*, so one line is finished before the next is started
+        return node.fvalue, -node.depth, node.serial, node
+
+    # A function to return the value of a best-first search node if it is a leaf
+    def _leaf_value(self, node, depth):
+        if node.depth == depth:
+            return node.board.score_board(self.playerValue, self.weights)
+
+        sideValue = self.playerValue if node.depth % 2 == 0 else self.oppValue
+        moves = self.filter_moves(node.board, sideValue,
+                                  self.ordered_moves(node.board))
+        node.moves = moves
+        # A full board is a draw
+        if not moves:
+            return 0
+        # filter_moves leaves only the winning move if there is one
+        if len(moves) == 1 and node.board.is_winning_square(
+                (node.board.isValidMove(moves[0]), moves[0]), sideValue):
+            node.best = moves[0]
+            return WIN_SCORE if sideValue == self.playerValue else -WIN_SCORE
+        return None
+
+    # A function to drop a best-first search node and everything below it
+    def _discard(self, node):
+        bound = max(node.forgotten.values(), default=-math.inf)
+        entries = 0
+        for child in node.children:
+            childBound, childEntries = self._discard(child)
+            bound = max(bound, childBound)
+            entries += childEntries
+        node.children = []
+        # Nodes still in the open heap are released when they leave it
+        if node.inOpen:
+            node.status = PURGED
+            node.parent_state = None
+            return max(bound, -node.fvalue), entries + 1
+        self.pool.release(node)
+        return bound, entries
+
+    # A function to forget the least promising nodes of a best-first search
+    def _prune(self, opened, target):
+        # The least promising nodes are the ones the search would reach last
+        worst = [(-node.fvalue, node.depth, -node.serial, node)
+                 for _, _, _, node in opened
+                 if node.status != PURGED and not node.children]
+        heapq.heapify(worst)
+        added = []
+        purged = 0
+        while self.pool.inUse - purged > target and worst:
+            node = heapq.heappop(worst)[-1]
+            if node.status == PURGED or node.parent_state is None:
+                continue
+            # Below a MIN node only one child is searched at a time, so the whole MIN
+            # node is forgotten and searched again from its first child if needed
+            while node.parent_state.depth % 2 == 1:
+                node = node.parent_state
+            parent = node.parent_state
+            bound, entries = self._discard(node)
+            purged += entries
+            parent.children.remove(node)
+            parent.forgotten[node.col] = max(parent.forgotten.get(node.col, -math.inf),
+                                             bound)
+            # The MAX node goes back into the heap, bounded by the best of its forgotten
+            # children, so it searches them again as soon as they may be the best line,
+            # even while its other children are still being searched
+            parent.fvalue = -max(parent.forgotten.values())
+            if not parent.inOpen:
+                parent.inOpen = True
+                added.append(parent)
+            # Only with nothing left below it is the MAX node itself a candidate to forget
+            if not parent.children:
+                heapq.heappush(worst, (-parent.fvalue, parent.depth, -parent.serial,
+                                       parent))
+
+        kept = []
+        for node in [entry[-1] for entry in opened] + added:
+            if node.status == PURGED:
+                node.inOpen = False
+                self.pool.release(node)
+            else:
+                kept.append(self._entry(node))
+        heapq.heapify(kept)
+        return kept
+
+    # A function to get the best move with memory-bounded best-first search
+    def best_first(self, board, depth, maxNodes=None):
+        """A function to get the best move and minimax value of a board with SSS* best-first search.
+
+        Nodes are States in a heap ordered by fvalue, the negated upper bound on the value
+        of the best line through them, so the most promising node is always searched next.
+        MAX nodes search all their moves at once and are solved by the first child solved,
+        while MIN nodes search their moves one at a time. The value equals :meth:`minimax`
+        at the same depth, usually visiting fewer nodes.
+
+        When more than maxNodes States are in use, the least promising nodes are forgotten
+        (SMA*-style): their bound is kept by their nearest MAX ancestor, which goes back
+        into the heap with the best bound it has forgotten and searches those children
+        again once that bound is the most promising, so the value is the same under any
+        memory limit. States come from a :class:`State.StatePool`, so forgotten and
+        finished nodes are reused.
+
+        :param board: Board instance
+        :type board: :class:`Board.Board`
+        :param depth: depth to search
+        :type depth: int
+        :param maxNodes: most States in use at once, defaults to self.maxNodes
+        :type maxNodes: int, optional
+
+        :raises:
+            **SearchStopped**: if stopEvent is set during the search
+
+        :return: column - int location of best column move, value - score of the search
+        :rtype: (column,value) tuple
+        """
+        # Enough nodes for one line of the search with all its MAX node moves
+        limit = max(maxNodes or self.maxNodes, len(MOVE_ORDER) * (depth + 1))
+        self.nodes = 0
+        self.serial = 0
+        root = self._node(board, None, 0, None)
+        opened = []
+        self._push(opened, root, math.inf)
+        try:
+            while True:
+                node = heapq.heappop(opened)[-1]
+                node.inOpen = False
+                if node.status == PURGED:
+                    self.pool.release(node)
+                    continue
+                h = -node.fvalue
+                parent = node.parent_state
+
+                if node.status == LIVE and node.forgotten:
+                    # Forgotten children are searched again below the bound they were forgotten with
+                    for col, bound in node.forgotten.items():
+                        child = self._node(node.board.makeMove(col, self.playerValue),
+                                           node, node.depth + 1, col)
+                        self._push(opened, child, min(h, bound))
+                    node.forgotten = {}
+
+                elif node.status == LIVE:
+                    self.nodes += 1
+                    if self.stopEvent is not None and self.stopEvent.is_set():
+                        raise SearchStopped()
+                    value = self._leaf_value(node, depth)
+                    if value is not None:
+                        node.status = SOLVED
+                        self._push(opened, node, min(h, value))
+                    elif node.depth % 2 == 0:
+                        for col in node.moves:
+                            child = self._node(node.board.makeMove(col, self.playerValue),
+                                               node, node.depth + 1, col)
+                            self._push(opened, child, h)
+                    else:
+                        col = node.moves[0]
+                        child = self._node(node.board.makeMove(col, self.oppValue),
+                                           node, node.depth + 1, col)
+                        self._push(opened, child, h)
+
+                elif parent is None:
+                    return node.best, h
+
+                elif node.depth % 2 == 1:
+                    # A solved MIN node solves its MAX parent. Forgotten siblings are no
+                    # better, or the parent would have left the heap before this node.
+                    parent.status = SOLVED
+                    parent.best = node.col
+                    parent.forgotten = {}
+                    for child in parent.children:
+                        self._discard(child)
+                    parent.children = []
+                    if parent.inOpen:
+                        # The parent is still in the heap with its forgotten bound
+                        opened = [entry for entry in opened if entry[-1] is not parent]
+                        heapq.heapify(opened)
+                    self._push(opened, parent, h)
+
+                else:
+                    # A solved MAX node moves its MIN parent on to the next move
+                    parent.children.remove(node)
+                    self.pool.release(node)
+                    index = parent.moves.index(node.col) + 1
+                    if index < len(parent.moves):
+                        col = parent.moves[index]
+                        child = self._node(parent.board.makeMove(col, self.oppValue),
+                                           parent, node.depth, col)
+                        self._push(opened, child, h)
+                    else:
+                        parent.status = SOLVED
+                        self._push(opened, parent, h)
+
+                if self.pool.inUse > limit:
+                    opened = self._prune(opened, int(limit * BEST_FIRST_KEEP))
+        finally:
+            self._discard(root)
+            for _, _, _, node in opened:
+                self.pool.release(node)
+
+    # A function to return the player's best move for a given state
+    def get_best_move(self, state):
+        """A function to return the player's best move for a given state.
+        
+        :param state: State instance
+        :type state: :class:`State.State`
+
+        :return: column index of best move
+        :rtype: int
+        """
+        board = state.board
+        valid_positions = board.get_valid_positions()
+        top_score = -99999
+        best_col = None
+        for col in valid_positions:
+            moveBoard = board.makeMove(col, self.playerValue)
+            if moveBoard is None:
+                continue
+            score = moveBoard.score_board(self.playerValue, self.weights)
+            if score > top_score:
+                top_score = score
+                best_col = col
+
+        return best_col
+
+    # A function to choose a col for next move (depends on player type)
+    def get_col_move(self, state):
+        """A function to choose a column for next move depending on the type of player.
+
+        The time taken and the nodes searched are recorded in :data:`Metrics.METRICS`.
+
+        :param state: State instance
+        :type state: :class:`State.State`
+
+        :return: column for next move to be made
+        :rtype: int
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        col = self._choose_col(state)
+        Metrics.METRICS.observe(self.type,
+                                self.depth if self.type in SEARCH_TYPES else 0,
+                                int(np.count_nonzero(state.board.matrix)),
+                                time.perf_counter() - start, self.nodes)
+        return col
+
+    # A function to choose a column for get_col_move
+    def _choose_col(self, state):
+        if self.type == 1:
+            return self.random_col(state)
+        # Network scores are on another scale, so they are kept out of the analysis cache
+        if self.type == 4:
+            return self.batch_search(state.board, self.depth)[0]
+
+        # A cached analysis at least as deep as this player searches is as good as a new search
+        if self.cache is not None:
+            key = state.board.key()
+            entry = self.cache.lookup(key)
+            if entry is not None and entry[0] >= self.depth and entry[2] is not None:
+                return entry[2]
+
+        if self.type == 2:
+            col, value = self.minimax(state.board, self.depth, -math.inf,
+                                      math.inf, True)
+        elif self.type == 3:
+            col, value = self.search(state.board, self.depth)
+        elif self.type == 5:
+            col, value = self.best_first(state.board, self.depth)
+        else:
+            return None
+
+        if self.cache is not None:
+            self.cache.store(key, self.depth, value, col)
+        return col
+       
@@ -79,6 +79,15 @@ class State:
             return False
         return self.board == other.board
 
+    # Hashes the State by its board, consistent with __eq__
+    def __hash__(self):
+        """A function to hash the State by its board, so equal States have equal hashes.
+
+        :return: hash of the board
+        :rtype: int
+        """
+        return hash(self.board)
+
     # Function to print a completed path from the initial state to the solution state #
     def printPath(self):
         """A function to print a complated path from the initial state to the solution state. This function calls print() statements directly, rather than returning a string.
@@ -88,3 +97,63 @@ class State:
         print(self.board)
         if self.parent_state is not None:
             self.parent_state.printPath()
+
+
+class StatePool:
+    """This class recycles State objects, so searches that create and drop many States do not allocate new ones.
+
+    Recycled States keep the board they are given instead of copying it, since boards are
+    never changed after :meth:`Board.Board.makeMove` returns them.
+
+    :Attributes:
+        * :free (*list*): released States ready to be reused
+        * :inUse (*int*): number of States acquired and not yet released
+        * :created (*int*): number of States the pool has created
+    """
+
+    def __init__(self):
+        """Constructor Method"""
+        self.free = []
+        self.inUse = 0
+        self.created = 0
+
+    # A function to get a State, reusing a released one if possible
+    def acquire(self, board, parent_state, depth, fvalue=0):
+        """A function to get a State with the given values, reusing a released State if there is one.
+
+        :param board: the board that belongs to the state
+        :type board: :class:`Board.Board`
+        :param parent_state: the State the new State came from
+        :type parent_state: :class:`State.State`
+        :param depth: the depth of the state
+        :type depth: int
+        :param fvalue: the priority order of the state, defaults to *0*
+        :type fvalue: int, optional
+
+        :return: State with the given values
+        :rtype: :class:`State.State`
+        """
+        self.inUse += 1
+        if self.free:
+            state = self.free.pop()
+            state.board = board
+            state.parent_state = parent_state
+            state.depth = depth
+            state.fvalue = fvalue
+            return state
+        self.created += 1
+        return State(board, parent_state, depth, fvalue)
+
+    # A function to give a State back to the pool
+    def release(self, state):
+        """A function to give a State back to the pool. The State must not be used afterwards.
+
+        :param state: State to release
+        :type state: :class:`State.State`
+
+        :return: *None*
+        """
+        self.inUse -= 1
+        state.board = None
+        state.parent_state = None
+        self.free.append(state)
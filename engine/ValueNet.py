@@ -0,0 +1,206 @@
+####################
+#  Value Network   #
+####################
+# A small fully connected network scoring positions for the player to move, evaluated
+# with NumPy on many positions at once, since evaluating one position per call spends
+# most of its time in Python overhead rather than in the matrix multiplies.
+#
+# Positions are encoded as 2 * 42 inputs: the pieces of the player to move, then the
+# opponent's pieces, one input per square in the Board.key bit order. Hidden layers use
+# ReLU and the output uses tanh, so values run from -1 (loss) to 1 (win).
+#
+# Networks are stored as .npz files holding W0, b0, W1, b1, ... in layer order.
+
+from engine import BitBoard
+
+import os
+
+import numpy as np
+
+ROW_COUNT = BitBoard.ROW_COUNT
+COL_COUNT = BitBoard.COL_COUNT
+
+# Number of inputs of the network
+INPUTS = 2 * ROW_COUNT * COL_COUNT
+
+# Positions evaluated per matrix multiply, unless another batch size is given
+BATCH_SIZE = 1024
+
+# Network file in the project directory used by default, unless another path is given in CONNECT4_NET
+NET_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "valuenet.npz")
+
+# Bit of each square in the Board.key layout, in input order
+SQUARE_BITS = np.array([col * BitBoard.COLUMN_BITS + row
+                        for col in range(COL_COUNT) for row in range(ROW_COUNT)],
+                       dtype=np.uint64)
+
+# Network loaded by default_net
+_defaultNet = None
+
+
+# A function to encode bitboards as network inputs
+def encode(masks, player1s, sideValue):
+    """A function to encode positions as network inputs for the player to move.
+
+    :param masks: bits of every piece of each position
+    :type masks: ndarray of uint64
+    :param player1s: bits of Player 1's pieces of each position
+    :type player1s: ndarray of uint64
+    :param sideValue: value of the player to move in every position
+    :type sideValue: int: 1 or 2
+
+    :return: (positions, :data:`INPUTS`) inputs
+    :rtype: ndarray of float32
+    """
+    if sideValue == 1:
+        own = player1s
+    else:
+        own = masks ^ player1s
+    opp = masks ^ own
+    bits = np.concatenate([(own[:, None] >> SQUARE_BITS) & np.uint64(1),
+                           (opp[:, None] >> SQUARE_BITS) & np.uint64(1)], axis=1)
+    return bits.astype(np.float32)
+
+
+# A function to create a network with random weights
+def random_net(hidden, rng):
+    """A function to create a network with random weights.
+
+    :param hidden: sizes of the hidden layers
+    :type hidden: list of int values
+    :param rng: random generator for the weights
+    :type rng: numpy.random.Generator
+
+    :return: untrained network
+    :rtype: :class:`.ValueNet`
+    """
+    sizes = [INPUTS] + list(hidden) + [1]
+    layers = []
+    for fanIn, fanOut in zip(sizes, sizes[1:]):
+        weights = rng.normal(0, np.sqrt(2 / fanIn), (fanIn, fanOut))
+        layers.append((weights.astype(np.float32),
+                       np.zeros(fanOut, dtype=np.float32)))
+    return ValueNet(layers)
+
+
+# A function to load a network from a .npz file
+def load_net(path):
+    """A function to load a network saved by :meth:`ValueNet.save`.
+
+    :param path: path of the .npz file
+    :type path: str
+
+    :raises:
+        **ValueError**: if the file's layers do not fit together
+
+    :return: loaded network
+    :rtype: :class:`.ValueNet`
+    """
+    with np.load(path) as data:
+        layers = []
+        while f"W{len(layers)}" in data:
+            i = len(layers)
+            layers.append((data[f"W{i}"].astype(np.float32),
+                           data[f"b{i}"].astype(np.float32)))
+    return ValueNet(layers)
+
+
+# A function to return the network used when none is given
+def default_net():
+    """A function to load the network in CONNECT4_NET, or the project's valuenet.npz, once.
+
+    :raises:
+        **FileNotFoundError**: if there is no network file
+
+    :return: default network
+    :rtype: :class:`.ValueNet`
+    """
+    global _defaultNet
+    if _defaultNet is None:
+        path = os.environ.get("CONNECT4_NET", NET_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                "No value network at " + path + ", train one with valuenet.py train")
+        _defaultNet = load_net(path)
+    return _defaultNet
+
+
+class ValueNet:
+    """This class holds a fully connected value network.
+
+    :param layers: (weights, biases) of each layer, the first taking :data:`INPUTS` inputs and the last giving 1 output
+    :type layers: list of (ndarray,ndarray) tuples
+
+    :raises:
+        **ValueError**: if the layers do not fit together
+
+    :Attributes:
+        * :layers (*list*): (weights, biases) of each layer
+    """
+
+    def __init__(self, layers):
+        """Constructor Method."""
+        size = INPUTS
+        for weights, biases in layers:
+            if weights.shape[0] != size or weights.shape[1] != len(biases):
+                raise ValueError("Invalid Layer Shapes!")
+            size = weights.shape[1]
+        if not layers or size != 1:
+            raise ValueError("Network must end in 1 output!")
+        self.layers = layers
+
+    # A function to evaluate a batch of encoded positions
+    def evaluate(self, inputs):
+        """A function to evaluate encoded positions with one matrix multiply per layer.
+
+        :param inputs: (positions, :data:`INPUTS`) inputs from :func:`encode`
+        :type inputs: ndarray
+
+        :return: value of each position for the player to move, from -1 to 1
+        :rtype: ndarray of float32
+        """
+        x = inputs
+        for weights, biases in self.layers[:-1]:
+            x = np.maximum(x @ weights + biases, 0)
+        weights, biases = self.layers[-1]
+        return np.tanh(x @ weights + biases)[:, 0]
+
+    # A function to evaluate bitboards in batches
+    def evaluate_bitboards(self, boards, sideValue, batchSize=BATCH_SIZE):
+        """A function to evaluate positions in batches of batchSize.
+
+        :param boards: positions to evaluate
+        :type boards: list of :class:`BitBoard.BitBoard`
+        :param sideValue: value of the player to move in every position
+        :type sideValue: int: 1 or 2
+        :param batchSize: positions per batch, defaults to :data:`BATCH_SIZE`
+        :type batchSize: int, optional
+
+        :return: value of each position for the player to move, from -1 to 1
+        :rtype: ndarray of float32
+        """
+        masks = np.array([board.mask for board in boards], dtype=np.uint64)
+        player1s = np.array([board.player1 for board in boards], dtype=np.uint64)
+        values = np.empty(len(boards), dtype=np.float32)
+        for start in range(0, len(boards), batchSize):
+            end = start + batchSize
+            values[start:end] = self.evaluate(
+                encode(masks[start:end], player1s[start:end], sideValue))
+        return values
+
+    # A function to save the network to a .npz file
+    def save(self, path):
+        """A function to save the network so :func:`load_net` can load it.
+
+        :param path: path of the .npz file
+        :type path: str
+
+        :return: *None*
+        """
+        arrays = {}
+        for i, (weights, biases) in enumerate(self.layers):
+            arrays[f"W{i}"] = weights
+            arrays[f"b{i}"] = biases
+        np.savez(path, **arrays)
@@ -0,0 +1,6 @@
+####################
+#  Engine Package  #
+####################
+# The game engine (Board, BitBoard, State and Player) without any GUI dependency,
+# so headless tools and worker processes can import it without pygame:
+#   from engine import Board, State, Player
@@ -0,0 +1,82 @@
+####################
+#   Import Timer   #
+####################
+# Measures the startup cost of headless entry points in fresh interpreters,
+# checks that they do not load pygame, and tracks the results over time.
+#
+# Usage:
+#   python importtime.py                               (report only)
+#   python importtime.py --record importtime.jsonl     (append results to the history)
+#   python importtime.py --max-ms 300                  (exit 1 if a module is slower)
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules that must import without pygame, in the order they are reported
+HEADLESS_MODULES = ["engine", "engine.Board", "engine.Player", "connect4",
+                    "selfplay", "analyze", "server"]
+
+# Code run in each fresh interpreter, prints import time (s) and whether pygame was loaded
+PROBE = ("import sys, time; start = time.perf_counter(); import {module}; "
+         "print(time.perf_counter() - start, 'pygame' in sys.modules)")
+
+
+# A function to time the import of a module in fresh interpreters
+def time_import(module, runs):
+    """A function to time the import of a module in fresh interpreters.
+
+    :param module: dotted module name
+    :type module: str
+    :param runs: number of interpreters to start
+    :type runs: int
+
+    :return: median import time (ms), median interpreter wall time (ms), *True* if pygame was loaded
+    :rtype: (float,float,bool) tuple
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    importTimes = []
+    wallTimes = []
+    pygameLoaded = False
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)], cwd=here,
+            capture_output=True, text=True, check=True).stdout.split()
+        wallTimes.append((time.perf_counter() - start) * 1000)
+        importTimes.append(float(output[0]) * 1000)
+        pygameLoaded = pygameLoaded or output[1] == "True"
+    return (statistics.median(importTimes), statistics.median(wallTimes),
+            pygameLoaded)
+
+
+# code here will be ran when importtime.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure headless import time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--record", help="JSON lines history file to append to")
+    parser.add_argument("--max-ms", type=float,
+                        help="fail if any module takes longer to import")
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    print(f"{'module':<16}{'import ms':>10}{'process ms':>12}  pygame")
+    for module in HEADLESS_MODULES:
+        importMs, wallMs, pygameLoaded = time_import(module, args.runs)
+        results[module] = round(importMs, 2)
+        print(f"{module:<16}{importMs:>10.1f}{wallMs:>12.1f}  "
+              f"{'LOADED' if pygameLoaded else 'no'}")
+        if pygameLoaded or (args.max_ms is not None and importMs > args.max_ms):
+            failed = True
+
+    if args.record:
+        with open(args.record, "a") as f:
+            f.write(json.dumps({"time": time.time(), "python": sys.version.split()[0],
+                                "import_ms": results}) + "\n")
+
+    sys.exit(1 if failed else 0)
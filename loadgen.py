@@ -0,0 +1,146 @@
+####################
+#  Load Generator  #
+####################
+# Plays many concurrent random games against server.py and reports
+# engine move throughput and latency percentiles. Latency runs from the first attempt
+# at a move until the server accepts it, so BUSY replies and the backoff between
+# retries are included; the round trip of the accepted attempt alone is reported too.
+
+from engine import Board
+
+import argparse
+import asyncio
+import random
+import time
+
+
+# A function to return the value at a given percentile of a sorted list
+def percentile(sortedValues, pct):
+    """A function to return the value at a given percentile of a sorted list.
+
+    :param sortedValues: values sorted in ascending order
+    :type sortedValues: list
+    :param pct: percentile between 0 and 100
+    :type pct: float
+
+    :return: value at the percentile, *None* if the list is empty
+    :rtype: float or None
+    """
+    if not sortedValues:
+        return None
+    index = min(len(sortedValues) - 1, int(len(sortedValues) * pct / 100))
+    return sortedValues[index]
+
+
+# A function to play games over one connection, recording how long every move took
+async def play_games(host, port, games, depth, latencies, serviceTimes, counters, rng):
+    """A function to play random games over one connection and record the latency of every move.
+
+    :param games: number of games to play on this connection
+    :type games: int
+    :param depth: engine search depth requested for each game
+    :type depth: int
+    :param latencies: list that move times (seconds) from the first attempt until the server
+                      accepted the move, BUSY retries included, are appended to
+    :type latencies: list
+    :param serviceTimes: list that round trip times (seconds) of the accepted attempts are appended to
+    :type serviceTimes: list
+    :param counters: dict of BUSY/ERR counts, updated in place
+    :type counters: dict
+    :param rng: random generator used to choose moves
+    :type rng: random.Random
+
+    :return: *None*
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def send(line):
+        start = time.perf_counter()
+        writer.write((line + "\n").encode())
+        await writer.drain()
+        reply = (await reader.readline()).decode().split()
+        return reply, time.perf_counter() - start
+
+    for _ in range(games):
+        first = rng.choice((1, 2))
+        reply, _elapsed = await send(f"NEW {depth} {first}")
+        while reply[0] == "BUSY":
+            counters["busy"] += 1
+            await asyncio.sleep(0.05)
+            reply, _elapsed = await send(f"NEW {depth} {first}")
+        gameId = reply[1]
+
+        # Track column heights locally so only legal moves are sent
+        heights = [0] * Board.COL_COUNT
+        while reply[0] == "OK" and reply[3] == "PLAYING":
+            if reply[2] != "-":
+                heights[int(reply[2]) - 1] += 1
+            col = rng.choice([c for c in range(Board.COL_COUNT)
+                              if heights[c] < Board.ROW_COUNT])
+            # A move is timed from its first attempt, so BUSY replies and backoff count
+            moveStart = time.perf_counter()
+            reply, elapsed = await send(f"PLAY {gameId} {col + 1}")
+            while reply[0] == "BUSY":
+                counters["busy"] += 1
+                await asyncio.sleep(0.05)
+                reply, elapsed = await send(f"PLAY {gameId} {col + 1}")
+            heights[col] += 1
+            latencies.append(time.perf_counter() - moveStart)
+            serviceTimes.append(elapsed)
+
+        if reply[0] == "ERR":
+            counters["errors"] += 1
+        await send(f"END {gameId}")
+        counters["games"] += 1
+
+    writer.write(b"QUIT\n")
+    await writer.drain()
+    writer.close()
+
+
+# A function to run the whole load test and print a report
+async def run_load(host, port, connections, games, depth, seed):
+    """A function to run many concurrent connections against the server and print a report.
+
+    :return: sorted list of move latencies in seconds, BUSY retries included
+    :rtype: list
+    """
+    latencies = []
+    serviceTimes = []
+    counters = {"games": 0, "busy": 0, "errors": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        play_games(host, port, games, depth, latencies, serviceTimes, counters,
+                   random.Random(seed + i)) for i in range(connections)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    serviceTimes.sort()
+    print(f"games: {counters['games']}  moves: {len(latencies)}  "
+          f"busy: {counters['busy']}  errors: {counters['errors']}")
+    print(f"throughput: {len(latencies) / elapsed:.1f} moves/s over {elapsed:.2f}s")
+    if latencies:
+        print("latency ms: p50 {:.1f}  p90 {:.1f}  p99 {:.1f}  max {:.1f}  "
+              "(first attempt to accepted)".format(
+                  *[percentile(latencies, p) * 1000 for p in (50, 90, 99, 100)]))
+        print("service ms: p50 {:.1f}  p90 {:.1f}  p99 {:.1f}  max {:.1f}  "
+              "(accepted attempt only)".format(
+                  *[percentile(serviceTimes, p) * 1000 for p in (50, 90, 99, 100)]))
+    return latencies
+
+
+# code here will be ran when loadgen.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Connect-4 server load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4444)
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--games", type=int, default=5,
+                        help="games played on each connection")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(run_load(args.host, args.port, args.connections, args.games,
+                         args.depth, args.seed))
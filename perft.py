@@ -0,0 +1,161 @@
+####################
+#      Perft       #
+####################
+# Counts the positions reachable in exactly D moves from a position, and how many of them
+# are won, with won positions not played on, using each board backend. Every backend must
+# give the same counts as the reference Board, so this is a quick check that a faster
+# backend has the same move generation and win detection, and a benchmark of how fast each
+# one is. --fast-leaves counts the last moves without making them, which is several times
+# faster but no longer checks win detection on the last move, so leaf wins are not counted.
+#
+# Usage:
+#   python perft.py --depth 6
+#   python perft.py --depth 7 --moves 4453 --divide          (counts split by first move)
+#   python perft.py --depth 8 --backend bitboard             (skip the slow reference Board)
+#   python perft.py --depth 9 --backend bitboard --fast-leaves   (move generation speed only)
+# Exits with status 1 if the backends disagree.
+
+from engine import Board, BitBoard
+
+import argparse
+import sys
+import time
+
+# Backends by name, each a function building a board from a move string
+BACKENDS = {
+    "board": Board.board_from_moves,
+    "bitboard": BitBoard.bitboard_from_moves,
+}
+
+
+# A function to count the positions reachable in exactly depth moves
+def perft(board, depth, sideValue, fastLeaves=False):
+    """A function to count the positions reachable in exactly depth moves, not playing on after a win.
+
+    :param board: board of any backend with makeMove, get_valid_positions and winner
+    :type board: :class:`Board.Board` or :class:`BitBoard.BitBoard`
+    :param depth: number of moves to make
+    :type depth: int
+    :param sideValue: value of the player to move
+    :type sideValue: int: 1 or 2
+    :param fastLeaves: *True* to count the last moves without making them, so wins on the last move are not counted, defaults to *False*
+    :type fastLeaves: bool, optional
+
+    :return: number of positions and number of those that are won
+    :rtype: (int,int) tuple
+    """
+    if depth == 0:
+        return 1, int(board.winner is not None)
+    if board.winner is not None:
+        return 0, 0
+    if fastLeaves and depth == 1:
+        return len(board.get_valid_positions()), 0
+    total = wins = 0
+    for col in board.get_valid_positions():
+        positions, won = perft(board.makeMove(col, sideValue), depth - 1,
+                               3 - sideValue, fastLeaves)
+        total += positions
+        wins += won
+    return total, wins
+
+
+# A function to count positions split by first move
+def divide(board, depth, sideValue, fastLeaves=False):
+    """A function to run :func:`perft` below each first move.
+
+    :param board: board of any backend
+    :type board: :class:`Board.Board` or :class:`BitBoard.BitBoard`
+    :param depth: number of moves to make, including the first move
+    :type depth: int
+    :param sideValue: value of the player to move
+    :type sideValue: int: 1 or 2
+    :param fastLeaves: *True* to count the last moves without making them, defaults to *False*
+    :type fastLeaves: bool, optional
+
+    :return: number of positions and won positions for each first column
+    :rtype: dict
+    """
+    if board.winner is not None:
+        return {}
+    return {col: perft(board.makeMove(col, sideValue), depth - 1, 3 - sideValue,
+                       fastLeaves)
+            for col in board.get_valid_positions()}
+
+
+# A function to run perft with every backend and compare the counts
+def compare(moves, depth, backends, split=False, fastLeaves=False):
+    """A function to run perft with each backend, printing counts and speed, and compare the counts.
+
+    :param moves: column digits (1-7) of the starting position
+    :type moves: str
+    :param depth: number of moves to make
+    :type depth: int
+    :param backends: names of the backends to run, the first is the reference
+    :type backends: list
+    :param split: *True* to count each first move separately, defaults to *False*
+    :type split: bool, optional
+    :param fastLeaves: *True* to count the last moves without making them, defaults to *False*
+    :type fastLeaves: bool, optional
+
+    :raises:
+        **ValueError**: if moves is not a valid game
+
+    :return: *True* if every backend gave the same counts, *False* if not
+    :rtype: bool
+    """
+    sideValue = (len(moves) % 2) + 1
+    results = {}
+    for name in backends:
+        board = BACKENDS[name](moves)
+        start = time.perf_counter()
+        if split and depth > 0:
+            counts = divide(board, depth, sideValue, fastLeaves)
+        else:
+            counts = {None: perft(board, depth, sideValue, fastLeaves)}
+        elapsed = time.perf_counter() - start
+        total = sum(positions for positions, _ in counts.values())
+        wins = sum(won for _, won in counts.values())
+        results[name] = counts
+        print(f"{name:>10}: {total} positions ({wins} won) in {elapsed:.3f}s, "
+              f"{total / elapsed if elapsed else 0:,.0f} positions/s")
+
+    reference = backends[0]
+    if split and depth > 0:
+        for col, (count, won) in sorted(results[reference].items()):
+            line = f"{col + 1}: {count} ({won} won)"
+            for name in backends[1:]:
+                other = results[name].get(col)
+                if other != (count, won):
+                    line += f"  ({name}: {other})"
+            print(line)
+
+    matched = True
+    for name in backends[1:]:
+        if results[name] != results[reference]:
+            matched = False
+            print(f"MISMATCH: {name} differs from {reference}")
+    return matched
+
+
+# code here will be ran when perft.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Connect-4 perft counts for each board backend")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--moves", default="",
+                        help="starting position as column digits (1-7)")
+    parser.add_argument("--backend", nargs="+", choices=list(BACKENDS),
+                        default=list(BACKENDS),
+                        help="backends to run, the first is the reference")
+    parser.add_argument("--divide", action="store_true",
+                        help="count each first move separately")
+    parser.add_argument("--fast-leaves", action="store_true",
+                        help="count the last moves without making them, faster but skips leaf win detection")
+    args = parser.parse_args()
+
+    try:
+        matched = compare(args.moves, args.depth, args.backend, args.divide,
+                          args.fast_leaves)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+    sys.exit(0 if matched else 1)
@@ -0,0 +1,423 @@
+####################
+# Position Database#
+####################
+# Builds an indexed table of per-position statistics from archives of games, to answer
+# "how often does this position win for the side to move, and which reply is played most".
+#
+# Archives hold one game per line as a move string (column digits 1-7, Player 1 first).
+# Positions are keyed by Board.canonical_key, so a position and its mirror image share
+# a record, with replies stored for the canonical orientation.
+#
+# The table file is a header, the records sorted by key, and a sparse index holding the
+# first key of every block of BLOCK_RECORDS records. The sparse index is kept in memory,
+# so a lookup reads one block with a single seek.
+#
+# Records are counted in memory up to --max-entries, then spilled as sorted runs, and the
+# runs are merged into the table. Adding games merges new runs with the existing table,
+# so old games are never replayed.
+#
+# Usage:
+#   python posdb.py build games.txt more_games.txt -d positions.db
+#   python posdb.py add new_games.txt -d positions.db
+#   python posdb.py query 4453 -d positions.db
+
+from engine import Board, BitBoard
+
+import argparse
+import bisect
+import heapq
+import os
+import struct
+import sys
+import tempfile
+import time
+
+ROW_COUNT = Board.ROW_COUNT
+COL_COUNT = Board.COL_COUNT
+
+# File header: magic, format version, record count, offset of the sparse index, records per block
+HEADER = struct.Struct("<4sIQQI4x")
+MAGIC = b"C4PD"
+VERSION = 1
+
+# Record: key, games, wins and draws for the side to move, then the count of each reply
+RECORD = struct.Struct("<Q3I" + str(COL_COUNT) + "I")
+
+# Records per block of the sparse index
+BLOCK_RECORDS = 128
+
+# Bit layout of Board.key: each column has ROW_COUNT + 1 bits, the extra bit stays empty
+COLUMN_BITS = BitBoard.COLUMN_BITS
+
+
+# A function to replay a game and return every position it passed through
+def replay(moves):
+    """A function to replay a game with bitboards and return its positions and result.
+
+    :param moves: column digits (1-7) of the game
+    :type moves: str
+
+    :raises:
+        **ValueError**: if a move is invalid or made after the game was won
+
+    :return: positions - (canonical key, side to move, reply column in the canonical
+             orientation or *None* for the final position), winner - 1 or 2, 0 for a draw,
+             *None* if the game did not finish
+    :rtype: (list,int or None) tuple
+    """
+    pieces = {1: 0, 2: 0}
+    mirrored = {1: 0, 2: 0}
+    mask = 0
+    mirrorMask = 0
+    heights = [0] * COL_COUNT
+    positions = []
+    winner = None
+
+    for ply, char in enumerate(moves):
+        if winner is not None:
+            raise ValueError("Move made after the game was won!")
+        if not char.isdigit() or not 1 <= int(char) <= COL_COUNT:
+            raise ValueError("Invalid Column: " + char)
+        col = int(char) - 1
+        mirrorCol = COL_COUNT - 1 - col
+
+        if heights[col] == ROW_COUNT:
+            raise ValueError("Column is full: " + char)
+        bit = 1 << (col * COLUMN_BITS + heights[col])
+        mirrorBit = 1 << (mirrorCol * COLUMN_BITS + heights[col])
+        heights[col] += 1
+
+        key = mask + pieces[1]
+        mirrorKey = mirrorMask + mirrored[1]
+        sideValue = (ply % 2) + 1
+        if key <= mirrorKey:
+            positions.append((key, sideValue, col))
+        else:
+            positions.append((mirrorKey, sideValue, mirrorCol))
+
+        mask |= bit
+        mirrorMask |= mirrorBit
+        pieces[sideValue] |= bit
+        mirrored[sideValue] |= mirrorBit
+        if BitBoard.has_four(pieces[sideValue]):
+            winner = sideValue
+
+    if winner is None and len(moves) == ROW_COUNT * COL_COUNT:
+        winner = 0
+    positions.append((min(mask + pieces[1], mirrorMask + mirrored[1]),
+                      (len(moves) % 2) + 1, None))
+    return positions, winner
+
+
+# A function to count the statistics of a stream of games
+def count_games(lines, maxEntries, runDir, stats):
+    """A function to count per-position statistics of games, spilling sorted runs when memory fills.
+
+    :param lines: game move strings
+    :type lines: iterable
+    :param maxEntries: positions kept in memory before a run is written
+    :type maxEntries: int
+    :param runDir: directory for run files
+    :type runDir: str
+    :param stats: dict of counters (games, skipped), updated in place
+    :type stats: dict
+
+    :return: paths of the sorted run files
+    :rtype: list of str
+    """
+    counts = {}
+    runs = []
+    for line in lines:
+        moves = line.strip()
+        if not moves:
+            continue
+        try:
+            positions, winner = replay(moves)
+        except ValueError:
+            stats["skipped"] += 1
+            continue
+        # Only finished games say anything about who wins
+        if winner is None:
+            stats["skipped"] += 1
+            continue
+        stats["games"] += 1
+
+        for key, sideValue, reply in positions:
+            record = counts.get(key)
+            if record is None:
+                record = counts[key] = [0] * (3 + COL_COUNT)
+            record[0] += 1
+            if winner == sideValue:
+                record[1] += 1
+            elif winner == 0:
+                record[2] += 1
+            if reply is not None:
+                record[3 + reply] += 1
+
+        if len(counts) >= maxEntries:
+            runs.append(write_run(counts, runDir))
+            counts = {}
+
+    if counts:
+        runs.append(write_run(counts, runDir))
+    return runs
+
+
+# A function to write counted records as a sorted run file
+def write_run(counts, runDir):
+    """A function to write counted records, sorted by key, to a run file.
+
+    :return: path of the run file
+    :rtype: str
+    """
+    fd, path = tempfile.mkstemp(suffix=".run", dir=runDir)
+    with os.fdopen(fd, "wb") as f:
+        for key in sorted(counts):
+            f.write(RECORD.pack(key, *counts[key]))
+    return path
+
+
+# A function to read the records of a run file or table in key order
+def read_records(path, count=None, offset=0):
+    """A function to yield (key, counts) records from a file, in the order they are stored.
+
+    :param path: path of the file
+    :type path: str
+    :param count: number of records to read, defaults to all records until the end of the file
+    :type count: int, optional
+    :param offset: byte offset of the first record, defaults to *0*
+    :type offset: int, optional
+
+    :return: generator of (key, list of counts) tuples
+    :rtype: generator
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        read = 0
+        while count is None or read < count:
+            chunk = 1024 if count is None else min(1024, count - read)
+            data = f.read(RECORD.size * chunk)
+            if not data:
+                break
+            for values in RECORD.iter_unpack(data):
+                yield values[0], list(values[1:])
+                read += 1
+
+
+# A function to merge sorted record streams into a new table
+def write_table(streams, path):
+    """A function to merge sorted record streams, adding up records with equal keys, into a table file.
+
+    The table is written next to *path* and moved into place once complete.
+
+    :param streams: iterables of (key, counts) in key order
+    :type streams: list
+    :param path: path of the table file
+    :type path: str
+
+    :return: number of records in the table
+    :rtype: int
+    """
+    tmpPath = path + ".tmp"
+    blockKeys = []
+    recordCount = 0
+    with open(tmpPath, "wb") as f:
+        f.write(bytes(HEADER.size))
+        current = None
+        for key, counts in heapq.merge(*streams, key=lambda record: record[0]):
+            if current is not None and current[0] == key:
+                current[1] = [a + b for a, b in zip(current[1], counts)]
+                continue
+            if current is not None:
+                if recordCount % BLOCK_RECORDS == 0:
+                    blockKeys.append(current[0])
+                f.write(RECORD.pack(current[0], *current[1]))
+                recordCount += 1
+            current = [key, counts]
+        if current is not None:
+            if recordCount % BLOCK_RECORDS == 0:
+                blockKeys.append(current[0])
+            f.write(RECORD.pack(current[0], *current[1]))
+            recordCount += 1
+
+        indexOffset = f.tell()
+        f.write(struct.pack("<" + str(len(blockKeys)) + "Q", *blockKeys))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, recordCount, indexOffset,
+                            BLOCK_RECORDS))
+    os.replace(tmpPath, path)
+    return recordCount
+
+
+class PositionDB:
+    """This class looks up position statistics in a table file, using an in-memory sparse index.
+
+    :param path: path of the table file
+    :type path: str
+
+    :raises:
+        **ValueError**: if the file is not a position table
+
+    :Attributes:
+        * :recordCount (*int*): number of positions in the table
+        * :blockKeys (*list*): first key of every block of records
+    """
+
+    def __init__(self, path):
+        """Constructor Method."""
+        self.path = path
+        self.file = open(path, "rb")
+        magic, version, self.recordCount, self.indexOffset, self.blockRecords = \
+            HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a position table: " + path)
+        blocks = -(-self.recordCount // self.blockRecords)
+        self.file.seek(self.indexOffset)
+        self.blockKeys = list(struct.unpack("<" + str(blocks) + "Q",
+                                            self.file.read(8 * blocks)))
+
+    def records(self):
+        """A function to yield every record of the table in key order.
+
+        :return: generator of (key, list of counts) tuples
+        :rtype: generator
+        """
+        return read_records(self.path, self.recordCount, HEADER.size)
+
+    def lookup_key(self, key):
+        """A function to look up the record of a canonical key with one block read.
+
+        :param key: canonical position key
+        :type key: int
+
+        :return: counts (games, wins, draws, replies...), *None* if the position is not in the table
+        :rtype: list or None
+        """
+        block = bisect.bisect_right(self.blockKeys, key) - 1
+        if block < 0:
+            return None
+        first = block * self.blockRecords
+        count = min(self.blockRecords, self.recordCount - first)
+        self.file.seek(HEADER.size + first * RECORD.size)
+        data = self.file.read(count * RECORD.size)
+
+        # Binary search of the block
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            recordKey = struct.unpack_from("<Q", data, middle * RECORD.size)[0]
+            if recordKey < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < count:
+            values = RECORD.unpack_from(data, low * RECORD.size)
+            if values[0] == key:
+                return list(values[1:])
+        return None
+
+    def lookup(self, moves):
+        """A function to look up the statistics of the position after a move string.
+
+        :param moves: column digits (1-7) played so far
+        :type moves: str
+
+        :raises:
+            **ValueError**: if the move string is invalid
+
+        :return: games, wins, draws and losses for the side to move, and reply counts by column
+                 (0-6, as played in this position), *None* if the position is not in the table
+        :rtype: dict or None
+        """
+        board = Board.board_from_moves(moves)
+        key = board.key()
+        mirrorKey = board.key(mirror=True)
+        counts = self.lookup_key(min(key, mirrorKey))
+        if counts is None:
+            return None
+        replies = counts[3:]
+        # Replies are stored for the canonical orientation
+        if mirrorKey < key:
+            replies = replies[::-1]
+        games, wins, draws = counts[:3]
+        return {"games": games, "wins": wins, "draws": draws,
+                "losses": games - wins - draws, "replies": replies}
+
+    def close(self):
+        """A function to close the table file.
+
+        :return: *None*
+        """
+        self.file.close()
+
+
+# A function to add archives of games to a table, creating it if needed
+def add_games(paths, dbPath, maxEntries=2000000):
+    """A function to add archives of games to a table, merging with the existing table if there is one.
+
+    :param paths: paths of game archives, "-" for stdin
+    :type paths: list of str
+    :param dbPath: path of the table file
+    :type dbPath: str
+    :param maxEntries: positions counted in memory before a sorted run is written
+    :type maxEntries: int
+
+    :return: counters of games added and skipped, and records in the table
+    :rtype: dict
+    """
+    stats = {"games": 0, "skipped": 0}
+    runDir = os.path.dirname(os.path.abspath(dbPath))
+    runs = []
+    try:
+        for path in paths:
+            stream = sys.stdin if path == "-" else open(path)
+            with stream:
+                runs += count_games(stream, maxEntries, runDir, stats)
+
+        streams = [read_records(run) for run in runs]
+        existing = None
+        if os.path.exists(dbPath):
+            existing = PositionDB(dbPath)
+            streams.append(existing.records())
+        stats["records"] = write_table(streams, dbPath)
+        if existing is not None:
+            existing.close()
+    finally:
+        for run in runs:
+            os.remove(run)
+    return stats
+
+
+# code here will be ran when posdb.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Indexed Connect-4 position database")
+    parser.add_argument("command", choices=["build", "add", "query"])
+    parser.add_argument("args", nargs="+",
+                        help="game archives (build/add) or move strings (query)")
+    parser.add_argument("-d", "--db", default="positions.db", help="table file")
+    parser.add_argument("--max-entries", type=int, default=2000000,
+                        help="positions counted in memory before spilling a sorted run")
+    args = parser.parse_args()
+
+    if args.command == "query":
+        db = PositionDB(args.db)
+        for moves in args.args:
+            result = db.lookup(moves)
+            if result is None:
+                print(f"{moves}: not in database")
+                continue
+            games = result["games"]
+            best = max(range(COL_COUNT), key=lambda col: result["replies"][col])
+            reply = str(best + 1) if result["replies"][best] else "-"
+            print(f"{moves}: {games} games, side to move wins {result['wins'] / games:.1%}, "
+                  f"draws {result['draws'] / games:.1%}, loses {result['losses'] / games:.1%}, "
+                  f"most played reply {reply} ({result['replies'][best]} times)")
+        db.close()
+    else:
+        if args.command == "build" and os.path.exists(args.db):
+            os.remove(args.db)
+        start = time.perf_counter()
+        stats = add_games(args.args, args.db, args.max_entries)
+        print(f"added {stats['games']} games ({stats['skipped']} skipped), "
+              f"{stats['records']} positions in {args.db}, "
+              f"{time.perf_counter() - start:.2f}s")
@@ -0,0 +1,314 @@
+####################
+#  Game Profiler   #
+####################
+# Plays whole headless games under a profiler and reports where the engine spends its time.
+#
+# The default sampling profiler interrupts the process every --interval ms of CPU time and
+# records the Python stack, which keeps the overhead low enough for representative numbers.
+# It writes a per-function report and a collapsed-stack file ("a;b;c count" per line) that
+# flamegraph.pl, speedscope and inferno can read. --deterministic uses cProfile instead, for
+# exact timings at a much higher overhead, and writes the same report and collapsed stacks
+# folded from its call graph.
+#
+# Usage:
+#   python profile_games.py --games 5 --player1 2 --player2 3 --depth 4 --collapsed games.folded
+#   python profile_games.py --script openings.txt --deterministic
+
+from engine import Player
+import selfplay
+
+import argparse
+import collections
+import cProfile
+import os
+import random
+import signal
+import time
+
+# Engine functions that are always listed first in the report
+HOT_FUNCTIONS = ["Board.makeMove", "Board.win_state", "Board.neighbors",
+                 "Board.score_board", "Board.score_neighbors",
+                 "Player.minimax", "Player.pvs", "Player.filter_moves"]
+
+
+# A function to return the label of a code object used in reports and collapsed stacks
+def code_label(code):
+    """A function to return the label of a code object, e.g. ``Board.makeMove``.
+
+    :param code: Python code object, or the name cProfile gives a built-in function
+    :type code: code or str
+
+    :return: qualified function name, prefixed with the module for module level functions
+    :rtype: str
+    """
+    if isinstance(code, str):
+        return code
+    name = getattr(code, "co_qualname", code.co_name)
+    if "." not in name:
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        name = module + "." + name
+    return name
+
+
+# A function to return the label of a frame used in reports and collapsed stacks
+def frame_label(frame):
+    """A function to return the label of a stack frame, e.g. ``Board.makeMove``.
+
+    :param frame: Python stack frame
+    :type frame: frame
+
+    :return: qualified function name, prefixed with the module for module level functions
+    :rtype: str
+    """
+    return code_label(frame.f_code)
+
+
+class StackProfile:
+    """This class holds weighted Python stacks and reports them per function and as collapsed stacks.
+
+    :Attributes:
+        * :stacks (*collections.Counter*): sample counts keyed by stack (tuple of labels, outermost first)
+        * :samples (*int*): number of samples taken
+        * :cpuTime (*float*): CPU seconds the samples cover
+    """
+
+    def __init__(self):
+        """Constructor Method."""
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.cpuTime = 0
+
+    # A function to return the first line of the report
+    def _header(self, ms):
+        return f"{self.samples} samples, {ms:.2f} ms of CPU time each"
+
+    def function_stats(self):
+        """A function to return self and total sample counts per function.
+
+        A function counts once towards its total per sample, even when it is on the stack
+        several times, so recursive searches are not counted more than once.
+
+        :return: dict mapping label to (self samples, total samples)
+        :rtype: dict
+        """
+        selfCounts = collections.Counter()
+        totalCounts = collections.Counter()
+        for stack, count in self.stacks.items():
+            selfCounts[stack[-1]] += count
+            for label in set(stack):
+                totalCounts[label] += count
+        return {label: (selfCounts[label], totalCounts[label])
+                for label in totalCounts}
+
+    def write_collapsed(self, path):
+        """A function to write the samples as collapsed stacks for flamegraph tools.
+
+        :param path: path of the output file
+        :type path: str
+
+        :return: *None*
+        """
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                if round(count) > 0:
+                    f.write(";".join(stack) + " " + str(round(count)) + "\n")
+
+    def report(self, top=15):
+        """A function to return a per-function report, engine hot path functions first.
+
+        :param top: number of other functions listed by self time
+        :type top: int
+
+        :return: report text
+        :rtype: str
+        """
+        stats = self.function_stats()
+        # The kernel may round the timer up to its tick, so samples are weighted by the measured CPU time
+        ms = self.cpuTime * 1000 / max(1, self.samples)
+
+        def row(label):
+            selfCount, totalCount = stats.get(label, (0, 0))
+            return (f"{label:<40}{selfCount * ms:>10.0f}{totalCount * ms:>11.0f}"
+                    f"{100 * selfCount / max(1, self.samples):>8.1f}"
+                    f"{100 * totalCount / max(1, self.samples):>8.1f}")
+
+        lines = [self._header(ms),
+                 f"{'function':<40}{'self ms':>10}{'total ms':>11}{'self %':>8}{'total %':>8}"]
+        lines += [row(label) for label in HOT_FUNCTIONS]
+        lines.append("-" * 77)
+        others = sorted((label for label in stats if label not in HOT_FUNCTIONS),
+                        key=lambda label: -stats[label][0])
+        lines += [row(label) for label in others[:top]]
+        return "\n".join(lines)
+
+
+class SamplingProfiler(StackProfile):
+    """This class samples the Python stack on a CPU time interval timer.
+
+    :param interval: sampling interval in seconds of CPU time
+    :type interval: float
+    """
+
+    def __init__(self, interval=0.001):
+        """Constructor Method."""
+        super().__init__()
+        self.interval = interval
+
+    # Signal handler that records the interrupted stack
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(frame_label(frame))
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[tuple(stack)] += 1
+        self.samples += 1
+
+    def start(self):
+        """A function to start sampling.
+
+        :return: *None*
+        """
+        self.cpuTime = time.process_time()
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        """A function to stop sampling.
+
+        :return: *None*
+        """
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+        self.cpuTime = time.process_time() - self.cpuTime
+
+
+class DeterministicProfiler(StackProfile):
+    """This class profiles with cProfile and folds its call graph into stacks for the same reports.
+
+    cProfile only records caller and callee pairs, so a function's time is split between its
+    callers in proportion to the time each spent calling it, and recursive calls are folded
+    into the outermost frame. Stacks are weighted in microseconds.
+
+    :Attributes:
+        * :profiler (*cProfile.Profile*): underlying profiler, for exact call counts
+    """
+
+    def __init__(self):
+        """Constructor Method."""
+        super().__init__()
+        self.profiler = cProfile.Profile()
+
+    # A function to return the first line of the report
+    def _header(self, ms):
+        return f"cProfile, {self.cpuTime * 1000:.0f} ms profiled, stacks folded from the call graph"
+
+    def start(self):
+        """A function to start profiling.
+
+        :return: *None*
+        """
+        self.profiler.enable()
+
+    def stop(self):
+        """A function to stop profiling and fold the call graph into stacks.
+
+        :return: *None*
+        """
+        self.profiler.disable()
+        entries = {entry.code: entry for entry in self.profiler.getstats()}
+        callees = {code: [(call.code, call.totaltime) for call in entry.calls or []]
+                   for code, entry in entries.items()}
+        called = {callee for code in callees for callee, _ in callees[code] if callee != code}
+
+        # Walk every call path from the functions nobody in the profile called
+        def walk(code, stack, seconds):
+            entry = entries.get(code)
+            if entry is None or entry.totaltime <= 0:
+                return
+            stack = stack + (code_label(code),)
+            self.stacks[stack] += seconds * entry.inlinetime / entry.totaltime * 1e6
+            for callee, calleeSeconds in callees[code]:
+                if code_label(callee) not in stack:
+                    walk(callee, stack, seconds * calleeSeconds / entry.totaltime)
+
+        for code, entry in entries.items():
+            if code not in called:
+                walk(code, (), entry.totaltime)
+        self.samples = sum(self.stacks.values())
+        self.cpuTime = self.samples / 1e6
+
+
+# A function to play the games that are profiled
+def play_games(games, player1Type, player2Type, depth, openings):
+    """A function to play headless games, one per opening.
+
+    :param games: number of games
+    :type games: int
+    :param player1Type: type of Player 1
+    :type player1Type: int
+    :param player2Type: type of Player 2
+    :type player2Type: int
+    :param depth: search depth of both players
+    :type depth: int
+    :param openings: column digits (1-7) each game starts from, reused in turn
+    :type openings: list of str
+
+    :return: total number of moves played
+    :rtype: int
+    """
+    moveCount = 0
+    for i in range(games):
+        opening = openings[i % len(openings)]
+        moves = selfplay.play_game(Player.Player(player1Type, 1, depth),
+                                   Player.Player(player2Type, 2, depth),
+                                   opening)[1]
+        moveCount += len(moves) - len(opening)
+    return moveCount
+
+
+# code here will be ran when profile_games.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Profile whole headless Connect-4 games")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--player1", type=int, default=2,
+                        help="Player 1 type (1: Random, 2: Minimax, 3: PVS)")
+    parser.add_argument("--player2", type=int, default=3, help="Player 2 type")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--script", help="file of openings (move strings), one per line")
+    parser.add_argument("--opening-plies", type=int, default=2,
+                        help="random opening length for self-play games")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="sampling interval in ms of CPU time")
+    parser.add_argument("--collapsed", default="profile.folded",
+                        help="collapsed-stack output file")
+    parser.add_argument("--deterministic", action="store_true",
+                        help="use cProfile instead of sampling")
+    args = parser.parse_args()
+
+    if args.script:
+        with open(args.script) as f:
+            openings = [line.strip() for line in f if line.strip()]
+    else:
+        rng = random.Random(args.seed)
+        openings = [selfplay.random_opening(rng, args.opening_plies)
+                    for _ in range(args.games)]
+
+    if args.deterministic:
+        profiler = DeterministicProfiler()
+    else:
+        profiler = SamplingProfiler(args.interval / 1000)
+    start = time.perf_counter()
+    profiler.start()
+    try:
+        moveCount = play_games(args.games, args.player1, args.player2,
+                               args.depth, openings)
+    finally:
+        profiler.stop()
+    elapsed = time.perf_counter() - start
+    print(profiler.report())
+    profiler.write_collapsed(args.collapsed)
+    print(f"collapsed stacks written to {args.collapsed}")
+    print(f"{args.games} games, {moveCount} moves in {elapsed:.2f}s "
+          f"({elapsed / max(1, moveCount) * 1000:.1f} ms/move)")
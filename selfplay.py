@@ -0,0 +1,70 @@
+####################
+#  Headless Games  #
+####################
+# Plays games between two Player instances without a GUI or console input.
+
+from engine import Board, State
+
+
+# A function to make a random legal opening that has not ended the game
+def random_opening(rng, plies):
+    """A function to make a random opening of a given length that does not end the game.
+
+    :param rng: random generator used to choose moves
+    :type rng: random.Random
+    :param plies: number of moves in the opening
+    :type plies: int
+
+    :return: string of column digits (1-7)
+    :rtype: str
+    """
+    while True:
+        board = Board.Board()
+        moves = ""
+        for i in range(plies):
+            col = rng.choice(board.get_valid_positions())
+            board = board.makeMove(col, (i % 2) + 1)
+            moves += str(col + 1)
+            if board.winner is not None:
+                break
+        if board.winner is None:
+            return moves
+
+
+# A function to play one game between two players
+def play_game(player1, player2, opening=""):
+    """A function to play one game between two players, starting after an optional opening.
+
+    A move that is not legal (e.g. a random player choosing a full column) is replaced by
+    the first valid column.
+
+    :param player1: Player with playerValue 1, moves first
+    :type player1: :class:`Player.Player`
+    :param player2: Player with playerValue 2
+    :type player2: :class:`Player.Player`
+    :param opening: column digits (1-7) played before the players take over, defaults to *""*
+    :type opening: str, optional
+
+    :return: winner - 1 or 2, or 0 for a draw, moves - column digits (1-7) of the whole game
+    :rtype: (winner,moves) tuple
+    """
+    board = Board.board_from_moves(opening)
+    state = State.State(board, None, len(opening))
+    moves = opening
+    players = {1: player1, 2: player2}
+
+    while state.board.winner is None:
+        valid_positions = state.board.get_valid_positions()
+        if not valid_positions:
+            return 0, moves
+
+        playerValue = (state.depth % 2) + 1
+        col = players[playerValue].get_col_move(state)
+        if col not in valid_positions:
+            col = valid_positions[0]
+
+        state = State.State(state.board.makeMove(col, playerValue), state,
+                            state.depth + 1)
+        moves += str(col + 1)
+
+    return state.board.winner, moves
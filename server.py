@@ -0,0 +1,408 @@
+####################
+#   Game Server    #
+####################
+# Hosts many concurrent Connect-4 games over a line based TCP protocol.
+# Engine moves are computed by a bounded pool of worker processes.
+#
+# Protocol (one command per line, columns are numbered 1-7):
+#   NEW [depth] [first]  -> OK <id> <aiCol|-> <status>    first: 1 = client moves first, 2 = engine moves first
+#   PLAY <id> <col>      -> OK <id> <aiCol|-> <status>
+#   END <id>             -> OK <id>
+#   STATS                -> STATS games=<n> moves=<n> timeouts=<n> busy=<n> pending=<n>
+#   QUIT                 -> closes the connection
+# status is one of PLAYING, WIN1, WIN2 or DRAW.
+# Errors are answered with "ERR <message>", and "BUSY <id>" means the engine queue is full
+# and the client's move was not applied, so it may be sent again later.
+# Games can only be played and ended on the connection that created them, and a line
+# longer than the stream limit is answered with an error and closes the connection.
+
+from engine import Board, Metrics, State, Player
+
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import math
+import multiprocessing
+import time
+
+# Default search depth for engine moves
+DEFAULT_DEPTH = 4
+
+
+# A function run inside a worker process to get the engine's move for a position
+def engine_move(moves, depth):
+    """A function to get the engine's column for a position, run inside a worker process.
+
+    :param moves: string of column digits (1-7) played so far
+    :type moves: str
+    :param depth: minimax search depth
+    :type depth: int
+
+    :return: col - column index of the engine's move, nodes - number of nodes searched
+    :rtype: (col,nodes) tuple
+    """
+    board = Board.board_from_moves(moves)
+    AI = Player.Player(2, (len(moves) % 2) + 1)
+    col = AI.minimax(board, depth, -math.inf, math.inf, True)[0]
+    if col is None:
+        col = board.get_valid_positions()[0]
+    return col, AI.nodes
+
+
+class EngineBusy(Exception):
+    """Raised when the engine pool already has the maximum number of pending moves."""
+
+
+class EnginePool:
+    """This class dispatches engine moves to a bounded pool of worker processes.
+
+    :param workers: number of worker processes
+    :type workers: int
+    :param maxPending: maximum number of queued and running moves before new requests are rejected
+    :type maxPending: int
+    :param deadline: seconds to wait for a move before falling back to a one-ply move
+    :type deadline: float
+
+    :Attributes:
+        * :pending (*int*): number of moves queued or running in the pool
+        * :timeouts (*int*): number of moves that missed their deadline
+        * :rejected (*int*): number of moves rejected because the pool was full
+    """
+
+    def __init__(self, workers, maxPending, deadline):
+        """Constructor Method."""
+        # Spawned rather than forked, a worker started mid-session would otherwise inherit
+        # the open client sockets and keep them alive after the server closes them
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn"))
+        self.maxPending = maxPending
+        self.deadline = deadline
+        self.pending = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.futures = set()
+
+    # A function to release a pool slot once a worker finishes, called on the event loop
+    def _release(self, future):
+        self.pending -= 1
+        self.futures.discard(future)
+        # Mark a timed out move's result as seen, it is no longer awaited
+        if not future.cancelled():
+            future.exception()
+
+    # A function to get the engine's move for a game
+    async def get_move(self, game):
+        """A function to get the engine's move for a game, honouring the pool bound and the deadline.
+
+        A timed out move keeps its pool slot until the worker actually finishes, so slow searches
+        still count against the bound.
+
+        :param game: game to move in
+        :type game: :class:`Game`
+
+        :raises:
+            **EngineBusy**: if the pool already has *maxPending* moves
+            **BrokenProcessPool**: if a worker process died
+
+        :return: column index of the engine's move
+        :rtype: int
+        """
+        if self.pending >= self.maxPending:
+            self.rejected += 1
+            raise EngineBusy()
+
+        start = time.perf_counter()
+        # Counted once submitted, so a broken pool that refuses the move holds no slot
+        future = self.executor.submit(engine_move, game.moves, game.depth)
+        self.pending += 1
+        # Callbacks of the wrapped future run on the event loop, not the executor's thread,
+        # so pending is only ever changed from one thread
+        wrapped = asyncio.wrap_future(future)
+        wrapped.add_done_callback(self._release)
+        self.futures.add(wrapped)
+        try:
+            # The shield keeps a timeout from cancelling wrapped before the worker finishes
+            col, nodes = await asyncio.wait_for(asyncio.shield(wrapped),
+                                                self.deadline)
+        except asyncio.TimeoutError:
+            # The worker keeps running, but the game falls back to the best one-ply move
+            future.cancel()
+            self.timeouts += 1
+            col = game.AI.get_best_move(game.state)
+            nodes = 0
+        # Latency as the client sees it, including time queued for a worker
+        Metrics.METRICS.observe(2, game.depth, len(game.moves),
+                                time.perf_counter() - start, nodes)
+        return col
+
+    def shutdown(self):
+        """A function to stop the worker processes.
+
+        :return: *None*
+        """
+        # Queued moves are cancelled by hand, shutdown(cancel_futures=True) needs Python 3.9
+        for future in list(self.futures):
+            future.cancel()
+        self.executor.shutdown(wait=False)
+
+
+class Game:
+    """This class holds the in-memory state of one game hosted by the server.
+
+    :param gameId: id of the game
+    :type gameId: int
+    :param depth: search depth of the engine for this game
+    :type depth: int
+    :param aiValue: number of the engine Player (1 or 2)
+    :type aiValue: int
+
+    :Attributes:
+        * :moves (*str*): column digits (1-7) played so far
+        * :state (:class:`State.State`): current state of the game
+        * :AI (:class:`Player.Player`): engine player
+    """
+
+    def __init__(self, gameId, depth, aiValue):
+        """Constructor Method."""
+        self.id = gameId
+        self.depth = depth
+        self.moves = ""
+        self.state = State.State(Board.Board(), None, 0)
+        self.AI = Player.Player(2, aiValue)
+
+    # A function to make a move in the game
+    def play(self, col):
+        """A function to make a move for the side to move.
+
+        :param col: column index of the move
+        :type col: int
+
+        :raises:
+            **ValueError**: if the game is over or the column is invalid or full
+
+        :return: *None*
+        """
+        board = self.state.board
+        if self.status() != "PLAYING":
+            raise ValueError("Game is over")
+        if not 0 <= col < board.COL_COUNT or board.isValidMove(col) is None:
+            raise ValueError("Invalid column")
+        playerValue = (len(self.moves) % 2) + 1
+        self.state.board = board.makeMove(col, playerValue)
+        self.state.depth += 1
+        self.moves += str(col + 1)
+
+    def ai_to_move(self):
+        """A function to check if it is the engine's turn.
+
+        :return: *True* if the engine moves next
+        :rtype: bool
+        """
+        return (self.status() == "PLAYING"
+                and (len(self.moves) % 2) + 1 == self.AI.playerValue)
+
+    def status(self):
+        """A function to return the status string of the game.
+
+        :return: PLAYING, WIN1, WIN2 or DRAW
+        :rtype: str
+        """
+        board = self.state.board
+        if board.winner is not None:
+            return "WIN" + str(board.winner)
+        if not board.get_valid_positions():
+            return "DRAW"
+        return "PLAYING"
+
+
+class GameServer:
+    """This class serves the line based game protocol to many concurrent clients.
+
+    :param pool: engine pool used for engine moves
+    :type pool: :class:`EnginePool`
+    :param defaultDepth: search depth used when NEW does not give one
+    :type defaultDepth: int
+
+    :Attributes:
+        * :games (*dict*): games being played, keyed by id
+        * :moveCount (*int*): number of engine moves served
+    """
+
+    def __init__(self, pool, defaultDepth=DEFAULT_DEPTH):
+        """Constructor Method."""
+        self.pool = pool
+        self.defaultDepth = defaultDepth
+        self.games = {}
+        self.moveCount = 0
+        self.ids = itertools.count(1)
+
+    # A function to reply to a command after the engine has made its move
+    async def _engine_reply(self, game):
+        aiCol = "-"
+        if game.ai_to_move():
+            col = await self.pool.get_move(game)
+            game.play(col)
+            self.moveCount += 1
+            aiCol = str(col + 1)
+        return f"OK {game.id} {aiCol} {game.status()}"
+
+    # A function to answer a single protocol command
+    async def handle_command(self, line, owned):
+        """A function to answer a single protocol command.
+
+        :param line: command line without its newline
+        :type line: str
+        :param owned: ids of games created on this connection
+        :type owned: set
+
+        :return: reply line
+        :rtype: str
+        """
+        parts = line.split()
+        if not parts:
+            return "ERR empty command"
+        command = parts[0].upper()
+
+        try:
+            if command == "NEW":
+                depth = int(parts[1]) if len(parts) > 1 else self.defaultDepth
+                first = int(parts[2]) if len(parts) > 2 else 1
+                if depth < 1 or first not in (1, 2):
+                    return "ERR invalid arguments"
+                if first == 2 and self.pool.pending >= self.pool.maxPending:
+                    self.pool.rejected += 1
+                    return "BUSY -"
+                # The engine plays whichever side the client does not
+                game = Game(next(self.ids), depth, 3 - first)
+                self.games[game.id] = game
+                owned.add(game.id)
+                return await self._engine_reply(game)
+
+            if command == "PLAY":
+                gameId = int(parts[1])
+                # Other connections' games are not visible, so their ids can not be guessed
+                if gameId not in owned:
+                    return "ERR unknown game"
+                game = self.games[gameId]
+                if game.ai_to_move():
+                    return "ERR not your turn"
+                if self.pool.pending >= self.pool.maxPending:
+                    self.pool.rejected += 1
+                    return f"BUSY {game.id}"
+                game.play(int(parts[2]) - 1)
+                return await self._engine_reply(game)
+
+            if command == "END":
+                gameId = int(parts[1])
+                if gameId not in owned:
+                    return "ERR unknown game"
+                self.games.pop(gameId, None)
+                owned.discard(gameId)
+                return f"OK {gameId}"
+
+            if command == "STATS":
+                return (f"STATS games={len(self.games)} moves={self.moveCount} "
+                        f"timeouts={self.pool.timeouts} busy={self.pool.rejected} "
+                        f"pending={self.pool.pending}")
+        except (IndexError, ValueError) as e:
+            return f"ERR {e or 'invalid arguments'}"
+        except EngineBusy:
+            return "BUSY -"
+        except concurrent.futures.BrokenExecutor:
+            return "ERR engine unavailable"
+
+        return "ERR unknown command"
+
+    # A function to serve one client connection
+    async def handle_client(self, reader, writer):
+        """A function to serve one client connection until it quits or disconnects.
+
+        :param reader: stream to read commands from
+        :type reader: asyncio.StreamReader
+        :param writer: stream to write replies to
+        :type writer: asyncio.StreamWriter
+
+        :return: *None*
+        """
+        owned = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # The rest of an overlong line can not be told apart from the next command
+                    writer.write(b"ERR line too long\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                line = line.decode(errors="replace").strip()
+                if line.upper() == "QUIT":
+                    break
+                reply = await self.handle_command(line, owned)
+                writer.write((reply + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # Games only live as long as the connection that created them
+            for gameId in owned:
+                self.games.pop(gameId, None)
+            writer.close()
+
+
+# A function to run the server until it is interrupted
+async def serve(host, port, workers, maxPending, deadline, depth,
+                metricsPath=None, metricsInterval=10.0):
+    """A function to run the game server until it is interrupted.
+
+    :param metricsPath: file engine move metrics are written to, defaults to *None* for none
+    :type metricsPath: str, optional
+    :param metricsInterval: seconds between metrics snapshots, defaults to *10.0*
+    :type metricsInterval: float, optional
+
+    :return: *None*
+    """
+    exporter = None
+    if metricsPath is not None:
+        exporter = Metrics.Exporter(Metrics.METRICS, metricsPath, metricsInterval)
+    pool = EnginePool(workers, maxPending, deadline)
+    server = GameServer(pool, depth)
+    tcpServer = await asyncio.start_server(server.handle_client, host, port,
+                                           limit=1024)
+    print(f"Serving Connect-4 on {host}:{port} with {workers} engine workers")
+    try:
+        async with tcpServer:
+            await tcpServer.serve_forever()
+    finally:
+        pool.shutdown()
+        if exporter is not None:
+            exporter.stop()
+
+
+# code here will be ran when server.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Connect-4 game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4444)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="engine worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=256,
+                        help="queued engine moves before clients get BUSY")
+    parser.add_argument("--deadline", type=float, default=2.0,
+                        help="seconds per engine move before falling back")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH,
+                        help="default engine search depth")
+    parser.add_argument("--metrics",
+                        help="file engine move metrics are written to (.json for JSON, else Prometheus text)")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="seconds between metrics snapshots")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_pending,
+                          args.deadline, args.depth, args.metrics,
+                          args.metrics_interval))
+    except KeyboardInterrupt:
+        pass
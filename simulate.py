@@ -0,0 +1,148 @@
+####################
+# Random Simulator #
+####################
+# Plays many uniformly random games at once, advancing every game by one move per step
+# with NumPy array operations instead of one Board.makeMove at a time.
+#
+# Usage:
+#   python simulate.py --games 1000000 --batch 100000
+#   python simulate.py --games 10000 --check 200   (replays games through Board to verify winners)
+
+from engine import Board
+
+import argparse
+import time
+
+import numpy as np
+
+ROW_COUNT = Board.ROW_COUNT
+COL_COUNT = Board.COL_COUNT
+
+# Boards are padded on every side so that win checks never index outside the array
+PAD = 3
+
+# Line directions as (row step, col step): horizontal, vertical, both diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+# A function to simulate a batch of random games in lockstep
+def simulate(games, rng, record=False):
+    """A function to play a batch of uniformly random games in lockstep.
+
+    Row 0 of the simulated boards is the bottom row, so a column's height is the row its
+    next piece lands in. After each move, only the lines through the new piece are checked.
+
+    :param games: number of games
+    :type games: int
+    :param rng: random generator used to choose moves
+    :type rng: numpy.random.Generator
+    :param record: *True* to also return the columns played, defaults to *False*
+    :type record: bool, optional
+
+    :return: outcomes - winner of each game (1 or 2, 0 for a draw), lengths - number of moves of
+             each game, and moves - (games, 42) columns played (-1 after the game ended) if record is set
+    :rtype: (ndarray,ndarray) or (ndarray,ndarray,ndarray) tuple
+    """
+    boards = np.zeros((games, ROW_COUNT + 2 * PAD, COL_COUNT + 2 * PAD),
+                      dtype=np.int8)
+    heights = np.zeros((games, COL_COUNT), dtype=np.int8)
+    outcomes = np.zeros(games, dtype=np.int8)
+    lengths = np.full(games, ROW_COUNT * COL_COUNT, dtype=np.int8)
+    moves = np.full((games, ROW_COUNT * COL_COUNT), -1, dtype=np.int8)
+    active = np.arange(games)
+
+    for ply in range(ROW_COUNT * COL_COUNT):
+        playerValue = (ply % 2) + 1
+
+        # The highest random draw among legal columns is a uniform choice of a legal column
+        legal = heights[active] < ROW_COUNT
+        draws = rng.random((len(active), COL_COUNT)) + legal
+        cols = np.argmax(draws, axis=1)
+        rows = heights[active, cols]
+
+        heights[active, cols] += 1
+        boards[active, rows + PAD, cols + PAD] = playerValue
+        if record:
+            moves[active, ply] = cols
+
+        # Count pieces in a row through the new piece, walking both ways in each direction
+        won = np.zeros(len(active), dtype=bool)
+        for dRow, dCol in DIRECTIONS:
+            streak = np.ones(len(active), dtype=np.int8)
+            for sign in (1, -1):
+                going = np.ones(len(active), dtype=bool)
+                for step in range(1, 4):
+                    going &= boards[active, rows + PAD + sign * step * dRow,
+                                    cols + PAD + sign * step * dCol] == playerValue
+                    streak += going
+            won |= streak >= 4
+
+        finished = active[won]
+        outcomes[finished] = playerValue
+        lengths[finished] = ply + 1
+        active = active[~won]
+        if len(active) == 0:
+            break
+
+    if record:
+        return outcomes, lengths, moves
+    return outcomes, lengths
+
+
+# A function to check simulated games against the reference Board
+def check_games(outcomes, moves, count):
+    """A function to replay simulated games with :class:`Board.Board` and compare the winners.
+
+    :param outcomes: winners returned by :func:`simulate`
+    :type outcomes: ndarray
+    :param moves: moves returned by :func:`simulate`
+    :type moves: ndarray
+    :param count: number of games to replay
+    :type count: int
+
+    :return: number of games whose winner differs
+    :rtype: int
+    """
+    mismatches = 0
+    for i in range(min(count, len(outcomes))):
+        moveString = "".join(str(col + 1) for col in moves[i] if col >= 0)
+        winner = Board.board_from_moves(moveString).winner or 0
+        if winner != outcomes[i]:
+            mismatches += 1
+            print(f"mismatch: {moveString} simulated {outcomes[i]} board {winner}")
+    return mismatches
+
+
+# code here will be ran when simulate.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Vectorized random Connect-4 games")
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--batch", type=int, default=100000,
+                        help="games simulated at once")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, default=0,
+                        help="replay this many games through Board to verify them")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    totals = np.zeros(3, dtype=np.int64)
+    lengthSum = 0
+    start = time.perf_counter()
+    remaining = args.games
+    while remaining > 0:
+        batch = min(args.batch, remaining)
+        outcomes, lengths = simulate(batch, rng)
+        totals += np.bincount(outcomes, minlength=3)
+        lengthSum += int(lengths.sum(dtype=np.int64))
+        remaining -= batch
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} games in {elapsed:.2f}s: {args.games / elapsed:,.0f} games/s")
+    print(f"Player 1 wins {totals[1] / args.games:.2%}, Player 2 wins "
+          f"{totals[2] / args.games:.2%}, draws {totals[0] / args.games:.2%}, "
+          f"mean length {lengthSum / args.games:.1f} moves")
+
+    if args.check:
+        outcomes, lengths, moves = simulate(args.check, rng, record=True)
+        mismatches = check_games(outcomes, moves, args.check)
+        print(f"checked {args.check} games against Board: {mismatches} mismatches")
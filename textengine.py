@@ -0,0 +1,247 @@
+####################
+#   Text Engine    #
+####################
+# A long-lived engine process driven by a line protocol on stdin/stdout, so other tools
+# can ask for moves without starting a new process or importing the engine themselves.
+#
+# Commands (columns are numbered 1-7):
+#   position [moves]     set the position to the moves played from the empty board
+#   go depth N           search to depth N
+#   go movetime T        search for T milliseconds
+#   stop                 stop the current search, which then reports its best move so far
+#   isready              answered with "readyok" once earlier commands are handled
+#   quit                 stop any search and exit
+# While searching, one line is written per completed depth:
+#   info depth D score S nodes N nps X time MS pv C
+# and the search ends with "bestmove C". S is "win", "loss" or a number for the player
+# to move. A finished game is answered with depth 0, score "loss" or "draw" and
+# "bestmove none".
+# Errors are answered with "error <message>".
+#
+# Results of completed depths are kept for the lifetime of the process (and in the
+# analysis cache file, with --cache), so repeated positions are answered without searching
+# if they were searched deep enough, and otherwise searched from the next depth on.
+#
+# Usage:
+#   python textengine.py [--cache analysis.cache]
+
+from engine import Board, Player
+from engine.AnalysisCache import AnalysisCache
+
+import argparse
+import sys
+import threading
+import time
+
+
+class TextEngine:
+    """This class runs searches for the text protocol and keeps their results between commands.
+
+    :param out: text stream replies are written to
+    :type out: file
+    :param cache: analysis cache shared with other processes, defaults to *None*
+    :type cache: :class:`AnalysisCache.AnalysisCache`, optional
+
+    :Attributes:
+        * :board (:class:`Board.Board`): current position
+        * :moves (*str*): column digits (1-7) of the current position
+        * :results (*dict*): best (depth, column, score) found for each position key
+    """
+
+    def __init__(self, out, cache=None):
+        """Constructor Method."""
+        self.out = out
+        self.cache = cache
+        self.board = Board.Board()
+        self.moves = ""
+        self.results = {}
+        self.stopEvent = threading.Event()
+        self.searchThread = None
+        self.outLock = threading.Lock()
+
+    def send(self, line):
+        """A function to write one reply line.
+
+        :return: *None*
+        """
+        with self.outLock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    # A function to format a score for info lines
+    def _score(self, value):
+        if value >= Player.WIN_SCORE - Board.ROW_COUNT * Board.COL_COUNT:
+            return "win"
+        if value <= -Player.WIN_SCORE + Board.ROW_COUNT * Board.COL_COUNT:
+            return "loss"
+        return str(round(value, 2))
+
+    # A function to remember the best result for a position
+    def _remember(self, key, depth, col, value):
+        known = self.results.get(key)
+        if known is None or known[0] <= depth:
+            self.results[key] = (depth, col, value)
+        if self.cache is not None:
+            self.cache.store(key, depth, value, col)
+
+    # A function to run one search, called on the search thread
+    def _search(self, board, depth, movetime):
+        start = time.perf_counter()
+        key = board.key()
+        maxDepth = depth
+        if maxDepth is None:
+            maxDepth = Board.ROW_COUNT * Board.COL_COUNT - len(self.moves)
+
+        # A finished game has no move, it was lost by the player to move or drawn
+        if board.winner is not None or not board.get_valid_positions():
+            score = "loss" if board.winner is not None else "draw"
+            self.send(f"info depth 0 score {score} nodes 0 nps 0 time 0 pv -")
+            self.send("bestmove none")
+            return
+
+        known = self.results.get(key)
+        if known is None and self.cache is not None:
+            entry = self.cache.lookup(key)
+            if entry is not None:
+                # The analysis cache stores (depth, score, best)
+                known = (entry[0], entry[2], entry[1])
+        if known is not None and known[1] is None:
+            known = None
+        best = [None]
+        if known is not None:
+            knownDepth, col, value = known
+            best[0] = col
+            self.send(f"info depth {knownDepth} score {self._score(value)} "
+                      f"nodes 0 nps 0 time 0 pv {col + 1}")
+            if knownDepth >= maxDepth:
+                self.send(f"bestmove {col + 1}")
+                return
+
+        AI = Player.Player(3, (len(self.moves) % 2) + 1, maxDepth)
+        AI.stopEvent = self.stopEvent
+
+        def report(iterDepth, col, value):
+            elapsed = time.perf_counter() - start
+            best[0] = col
+            self._remember(key, iterDepth, col, value)
+            self.send(f"info depth {iterDepth} score {self._score(value)} "
+                      f"nodes {AI.nodes} nps {int(AI.nodes / elapsed) if elapsed else 0} "
+                      f"time {int(elapsed * 1000)} pv {col + 1 if col is not None else '-'}")
+
+        timer = None
+        if movetime is not None:
+            timer = threading.Timer(movetime / 1000, self.stopEvent.set)
+            timer.start()
+        try:
+            # Completed depths are not searched again, the search continues past them
+            AI.search(board, maxDepth, report, known)
+        except Player.SearchStopped:
+            pass
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        col = best[0]
+        if col is None:
+            # Stopped before the first depth finished, so any reasonable move will do
+            moves = AI.ordered_moves(board)
+            col = moves[0] if moves else None
+        self.send("bestmove " + (str(col + 1) if col is not None else "none"))
+
+    # A function to stop the current search and wait for it to report
+    def stop(self):
+        """A function to stop the current search, if any, and wait for its bestmove.
+
+        :return: *None*
+        """
+        if self.searchThread is not None:
+            self.stopEvent.set()
+            self.searchThread.join()
+            self.searchThread = None
+
+    def handle(self, line):
+        """A function to handle one command line.
+
+        :param line: command line without its newline
+        :type line: str
+
+        :return: *False* if the engine should exit, *True* otherwise
+        :rtype: bool
+        """
+        parts = line.split()
+        if not parts:
+            return True
+        command = parts[0]
+
+        if command == "quit":
+            self.stop()
+            return False
+
+        if command == "stop":
+            self.stop()
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "position":
+            moves = parts[1] if len(parts) > 1 else ""
+            try:
+                board = Board.board_from_moves(moves)
+            except ValueError as e:
+                self.send(f"error {e}")
+                return True
+            self.stop()
+            self.board = board
+            self.moves = moves
+        elif command == "go":
+            depth = None
+            movetime = None
+            try:
+                if len(parts) == 3 and parts[1] == "depth":
+                    depth = max(1, int(parts[2]))
+                elif len(parts) == 3 and parts[1] == "movetime":
+                    movetime = max(1, int(parts[2]))
+                else:
+                    raise ValueError()
+            except ValueError:
+                self.send("error go needs depth N or movetime T")
+                return True
+            self.stop()
+            self.stopEvent.clear()
+            self.searchThread = threading.Thread(
+                target=self._search, args=(self.board, depth, movetime),
+                daemon=True)
+            self.searchThread.start()
+        else:
+            self.send(f"error unknown command {command}")
+        return True
+
+
+# A function to run the engine on stdin/stdout until quit
+def main(argv=None):
+    """A function to run the text engine on stdin and stdout until quit or end of input.
+
+    :param argv: command line arguments, defaults to *sys.argv[1:]*
+    :type argv: list, optional
+
+    :return: *None*
+    """
+    parser = argparse.ArgumentParser(description="Connect-4 text protocol engine")
+    parser.add_argument("--cache", help="persistent analysis cache file")
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        try:
+            cache = AnalysisCache(args.cache)
+        except ValueError as e:
+            parser.error(str(e))
+    engine = TextEngine(sys.stdout, cache)
+    for line in sys.stdin:
+        if not engine.handle(line.strip()):
+            break
+    else:
+        engine.stop()
+
+
+# code here will be ran when textengine.py is ran
+if __name__ == '__main__':
+    main()
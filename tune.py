@@ -0,0 +1,263 @@
+####################
+#  Weight Tuner    #
+####################
+# Tunes the evaluation weights of Board.score_board with SPSA, scoring each
+# candidate by headless games against the default weights across a process pool.
+# Game results are cached per (candidate, baseline, seed, depth, opening plies), and
+# every SPSA step is derived from the run seed, so an interrupted run replays its
+# finished steps from the cache without playing any games.
+#
+# Weights of each step go to <output>.partial, and only the final weights replace
+# <output>, so a killed run never leaves half-tuned weights where Board loads them.
+#
+# Usage:
+#   python tune.py --iterations 50 --games 32 --cache tune_cache.jsonl
+#   python tune.py --iterations 100 --cache tune_cache.jsonl   (resumes and continues)
+
+from engine import Board, Player
+import selfplay
+
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import time
+
+# Order of the weights in a parameter vector
+WEIGHT_NAMES = list(Board.DEFAULT_WEIGHTS)
+
+# Stability constant of the SPSA step size sequence
+SPSA_STABILITY = 5
+
+
+# A function to turn a parameter vector into a weights dict
+def vector_to_weights(vector):
+    """A function to turn a parameter vector into a weights dict, rounded so cache keys are stable.
+
+    :param vector: weight values in :data:`WEIGHT_NAMES` order
+    :type vector: list
+
+    :return: weights for :meth:`Board.Board.score_board`
+    :rtype: dict
+    """
+    return {name: round(value, 3) for name, value in zip(WEIGHT_NAMES, vector)}
+
+
+# A function to play a pair of games from the same opening, run inside a worker process
+def play_pair(candidate, baseline, seed, depth, openingPlies):
+    """A function to play the candidate against the baseline twice from one random opening, swapping colors.
+
+    :param candidate: candidate weights
+    :type candidate: dict
+    :param baseline: baseline weights
+    :type baseline: dict
+    :param seed: seed of the random opening
+    :type seed: int
+    :param depth: search depth of both players
+    :type depth: int
+    :param openingPlies: number of random moves before the players take over
+    :type openingPlies: int
+
+    :return: candidate's score over both games (win 1, draw 0.5, loss 0), divided by 2
+    :rtype: float
+    """
+    opening = selfplay.random_opening(random.Random(seed), openingPlies)
+    score = 0
+    for candidateValue in (1, 2):
+        weights = {candidateValue: candidate, 3 - candidateValue: baseline}
+        player1 = Player.Player(3, 1, depth, weights[1])
+        player2 = Player.Player(3, 2, depth, weights[2])
+        winner = selfplay.play_game(player1, player2, opening)[0]
+        if winner == candidateValue:
+            score += 1
+        elif winner == 0:
+            score += 0.5
+    return score / 2
+
+
+class ResultCache:
+    """This class stores game pair results on disk, keyed by the candidate and the settings of the games.
+
+    :param path: path of the JSON lines cache file, *None* to keep results in memory only
+    :type path: str or None
+
+    :Attributes:
+        * :results (*dict*): cached results keyed by :meth:`key`
+        * :hits (*int*): number of lookups answered from the cache
+    """
+
+    def __init__(self, path):
+        """Constructor Method."""
+        self.path = path
+        self.results = {}
+        self.hits = 0
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    # A run that was killed mid-write leaves a partial line behind
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.results[entry["key"]] = entry["score"]
+
+    def key(self, candidate, baseline, seed, depth, openingPlies):
+        """A function to return the cache key of a game pair.
+
+        Every setting that changes the games is part of the key, so results of runs with
+        another depth, opening length or baseline are never reused.
+
+        :return: cache key
+        :rtype: str
+        """
+        return json.dumps([[candidate[name] for name in WEIGHT_NAMES],
+                           [baseline[name] for name in WEIGHT_NAMES],
+                           seed, depth, openingPlies])
+
+    def get(self, candidate, baseline, seed, depth, openingPlies):
+        """A function to look up a cached result.
+
+        :return: cached score, *None* if the pair has not been played
+        :rtype: float or None
+        """
+        score = self.results.get(self.key(candidate, baseline, seed, depth,
+                                          openingPlies))
+        if score is not None:
+            self.hits += 1
+        return score
+
+    def put(self, candidate, baseline, seed, depth, openingPlies, score):
+        """A function to store a result, appending it to the cache file.
+
+        :return: *None*
+        """
+        key = self.key(candidate, baseline, seed, depth, openingPlies)
+        self.results[key] = score
+        if self.path is not None:
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"key": key, "score": score}) + "\n")
+
+
+# A function to score a candidate against the baseline over a list of seeds
+def evaluate(candidate, baseline, seeds, executor, cache, depth, openingPlies):
+    """A function to score a candidate against the baseline, playing only pairs missing from the cache.
+
+    :return: mean score of the candidate (0 to 1)
+    :rtype: float
+    """
+    scores = {}
+    futures = {}
+    for seed in seeds:
+        score = cache.get(candidate, baseline, seed, depth, openingPlies)
+        if score is None:
+            futures[executor.submit(play_pair, candidate, baseline, seed, depth,
+                                    openingPlies)] = seed
+        else:
+            scores[seed] = score
+
+    for future in concurrent.futures.as_completed(futures):
+        seed = futures[future]
+        scores[seed] = future.result()
+        cache.put(candidate, baseline, seed, depth, openingPlies, scores[seed])
+
+    return sum(scores.values()) / len(seeds)
+
+
+# A function to tune the weights with SPSA
+def spsa(iterations, pairs, depth, openingPlies, cache, output, workers=None,
+         seed=0, a=0.5, c=0.2):
+    """A function to tune the evaluation weights with simultaneous perturbation stochastic approximation.
+
+    Every step perturbs all weights at once by a random +/- step relative to their default size,
+    plays both perturbed candidates on the same openings, and moves along the estimated
+    gradient. The weights of every step are written to *output*.partial, and the tuned
+    weights replace *output* once all steps are done.
+
+    :param iterations: number of SPSA steps
+    :type iterations: int
+    :param pairs: game pairs played per candidate
+    :type pairs: int
+    :param cache: cache of played game pairs
+    :type cache: :class:`ResultCache`
+    :param output: path the tuned weights are published to
+    :type output: str
+    :param a: step size of weight updates
+    :type a: float
+    :param c: size of the perturbations, relative to each weight
+    :type c: float
+
+    :return: tuned weights
+    :rtype: dict
+    """
+    baseline = dict(Board.DEFAULT_WEIGHTS)
+    theta = [float(baseline[name]) for name in WEIGHT_NAMES]
+    scale = [max(1.0, abs(value)) for value in theta]
+    weights = vector_to_weights(theta)
+    gamesPlayed = 0
+    partial = output + ".partial"
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        for k in range(iterations):
+            start = time.perf_counter()
+            cachedBefore = len(cache.results)
+
+            # Standard SPSA gain sequences, independent of the run length so resumed runs match
+            ak = a / (k + 1 + SPSA_STABILITY) ** 0.602
+            ck = c / (k + 1) ** 0.101
+            rng = random.Random(seed * 1000003 + k)
+            delta = [rng.choice((-1, 1)) for _ in WEIGHT_NAMES]
+
+            plus = vector_to_weights([t + ck * d * s
+                                      for t, d, s in zip(theta, delta, scale)])
+            minus = vector_to_weights([t - ck * d * s
+                                       for t, d, s in zip(theta, delta, scale)])
+            # Both candidates play the same openings so their difference is less noisy
+            seeds = [seed * 1000003 + k * pairs + i for i in range(pairs)]
+            scorePlus = evaluate(plus, baseline, seeds, executor, cache, depth,
+                                 openingPlies)
+            scoreMinus = evaluate(minus, baseline, seeds, executor, cache,
+                                  depth, openingPlies)
+
+            for i in range(len(theta)):
+                gradient = (scorePlus - scoreMinus) / (2 * ck * delta[i])
+                theta[i] += ak * gradient * scale[i]
+
+            weights = vector_to_weights(theta)
+            with open(partial, "w") as f:
+                json.dump(weights, f, indent=4)
+
+            played = (len(cache.results) - cachedBefore) * 2
+            gamesPlayed += played
+            elapsed = time.perf_counter() - start
+            print(f"[{k + 1}/{iterations}] +{scorePlus:.3f} -{scoreMinus:.3f} "
+                  f"games {played} ({played / elapsed if elapsed else 0:.1f}/s) "
+                  f"{weights}")
+
+    print(f"played {gamesPlayed} games, {cache.hits} pairs resumed from cache")
+    if iterations > 0:
+        os.replace(partial, output)
+        print("tuned weights written to " + output)
+    return weights
+
+
+# code here will be ran when tune.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tune Board.score_board weights with SPSA self-play")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--games", type=int, default=32,
+                        help="games per candidate (played in color-swapped pairs)")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--opening-plies", type=int, default=4,
+                        help="random moves before the players take over")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", default="tune_cache.jsonl",
+                        help="JSON lines file of played game pairs")
+    parser.add_argument("--output", default=Board.WEIGHTS_FILE,
+                        help="weights file the tuned weights are written to when the run ends (loaded by Board at startup)")
+    args = parser.parse_args()
+
+    spsa(args.iterations, max(1, args.games // 2), args.depth,
+         args.opening_plies, ResultCache(args.cache), args.output,
+         args.workers, args.seed)
@@ -0,0 +1,233 @@
+####################
+#  Value Network   #
+####################
+# Trains the value network used by the Value Network player type, and benchmarks how
+# many positions per second it evaluates at different batch sizes.
+#
+# Training positions are taken from random games (simulate.py), each labelled with the
+# result of its game for the player to move, so the network learns which positions tend
+# to win under random play.
+#
+# Usage:
+#   python valuenet.py train --games 200000 --epochs 10 --out valuenet.npz
+#   python valuenet.py bench --net valuenet.npz --batches 1 16 256 4096 --depth 4
+
+from engine import Board, BitBoard, Player, ValueNet
+import simulate
+
+import argparse
+import time
+
+import numpy as np
+
+
+# A function to draw labelled positions from random games
+def random_positions(count, rng):
+    """A function to draw one unfinished position from each of count random games.
+
+    :param count: number of positions
+    :type count: int
+    :param rng: random generator for the games and positions
+    :type rng: numpy.random.Generator
+
+    :return: boards - positions, sides - value of the player to move in each position,
+             targets - 1 if the player to move went on to win, -1 if they lost, 0 for a draw
+    :rtype: (list,ndarray,ndarray) tuple
+    """
+    outcomes, lengths, moves = simulate.simulate(count, rng, record=True)
+    plies = (rng.random(count) * lengths).astype(np.int64)
+    boards = []
+    for i in range(count):
+        board = BitBoard.BitBoard()
+        for ply in range(plies[i]):
+            board = board.makeMove(int(moves[i, ply]), (ply % 2) + 1)
+        boards.append(board)
+    sides = (plies % 2) + 1
+    targets = np.where(outcomes == 0, 0.0,
+                       np.where(outcomes == sides, 1.0, -1.0)).astype(np.float32)
+    return boards, sides, targets
+
+
+# A function to encode positions whose player to move differs
+def encode_positions(boards, sides):
+    """A function to encode positions for the player to move in each of them.
+
+    :param boards: positions to encode
+    :type boards: list of :class:`BitBoard.BitBoard`
+    :param sides: value of the player to move in each position
+    :type sides: ndarray
+
+    :return: (positions, :data:`ValueNet.INPUTS`) inputs
+    :rtype: ndarray of float32
+    """
+    masks = np.array([board.mask for board in boards], dtype=np.uint64)
+    player1s = np.array([board.player1 for board in boards], dtype=np.uint64)
+    inputs = np.empty((len(boards), ValueNet.INPUTS), dtype=np.float32)
+    for sideValue in (1, 2):
+        index = sides == sideValue
+        inputs[index] = ValueNet.encode(masks[index], player1s[index], sideValue)
+    return inputs
+
+
+# A function to train a network on labelled positions
+def train(net, inputs, targets, epochs, batchSize, rate, rng, validation=None):
+    """A function to train a network in place to minimize squared error, using Adam.
+
+    :param net: network to train
+    :type net: :class:`ValueNet.ValueNet`
+    :param inputs: encoded positions
+    :type inputs: ndarray
+    :param targets: value of each position, from -1 to 1
+    :type targets: ndarray
+    :param epochs: number of passes over the positions
+    :type epochs: int
+    :param batchSize: positions per update
+    :type batchSize: int
+    :param rate: learning rate
+    :type rate: float
+    :param rng: random generator for shuffling
+    :type rng: numpy.random.Generator
+    :param validation: (inputs, targets) whose error is printed after each epoch, defaults to *None*
+    :type validation: (ndarray,ndarray) tuple, optional
+
+    :return: *None*
+    """
+    params = [array for layer in net.layers for array in layer]
+    moments = [np.zeros_like(array) for array in params]
+    squares = [np.zeros_like(array) for array in params]
+    step = 0
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(inputs))
+        for start in range(0, len(inputs), batchSize):
+            batch = order[start:start + batchSize]
+            x = inputs[batch]
+            y = targets[batch]
+
+            # Forward pass, keeping every layer's output
+            outputs = [x]
+            for weights, biases in net.layers[:-1]:
+                outputs.append(np.maximum(outputs[-1] @ weights + biases, 0))
+            weights, biases = net.layers[-1]
+            value = np.tanh(outputs[-1] @ weights + biases)
+
+            # Backward pass
+            grad = 2 * (value - y[:, None]) / len(batch) * (1 - value ** 2)
+            grads = []
+            for i in range(len(net.layers) - 1, -1, -1):
+                grads.append(grad.sum(axis=0))
+                grads.append(outputs[i].T @ grad)
+                if i > 0:
+                    grad = (grad @ net.layers[i][0].T) * (outputs[i] > 0)
+            grads.reverse()
+
+            step += 1
+            for param, g, m, v in zip(params, grads, moments, squares):
+                m *= 0.9
+                m += 0.1 * g
+                v *= 0.999
+                v += 0.001 * g ** 2
+                param -= rate * (m / (1 - 0.9 ** step)) / (
+                    np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+
+        line = f"epoch {epoch + 1}: train error {error(net, inputs, targets):.4f}"
+        if validation is not None:
+            line += f", validation error {error(net, *validation):.4f}"
+        print(line)
+
+
+# A function to return the mean squared error of a network
+def error(net, inputs, targets):
+    """A function to return the mean squared error of a network on labelled positions.
+
+    :param net: network
+    :type net: :class:`ValueNet.ValueNet`
+    :param inputs: encoded positions
+    :type inputs: ndarray
+    :param targets: value of each position
+    :type targets: ndarray
+
+    :return: mean squared error
+    :rtype: float
+    """
+    values = np.concatenate([net.evaluate(inputs[i:i + ValueNet.BATCH_SIZE])
+                             for i in range(0, len(inputs), ValueNet.BATCH_SIZE)])
+    return float(np.mean((values - targets) ** 2))
+
+
+# A function to measure evaluation speed at different batch sizes
+def bench(net, batches, count, depth, rng):
+    """A function to print positions evaluated per second at each batch size, alone and in a search.
+
+    :param net: network
+    :type net: :class:`ValueNet.ValueNet`
+    :param batches: batch sizes to measure
+    :type batches: list of int values
+    :param count: number of positions evaluated at each batch size
+    :type count: int
+    :param depth: depth of the searches timed with each batch size, 0 for none
+    :type depth: int
+    :param rng: random generator for the positions
+    :type rng: numpy.random.Generator
+
+    :return: *None*
+    """
+    boards, sides, targets = random_positions(count, rng)
+    # Positions are evaluated for Player 1, as in a search where every leaf has the same player to move
+    for batchSize in batches:
+        start = time.perf_counter()
+        net.evaluate_bitboards(boards, 1, batchSize)
+        elapsed = time.perf_counter() - start
+        print(f"batch {batchSize:>5}: {count / elapsed:>12,.0f} positions/s")
+
+    if depth > 0:
+        board = Board.board_from_moves("44")
+        AI = Player.Player(4, 1, depth, net=net)
+        for batchSize in batches:
+            start = time.perf_counter()
+            col, value = AI.batch_search(board, depth, batchSize)
+            elapsed = time.perf_counter() - start
+            print(f"depth {depth} search, batch {batchSize:>5}: {elapsed:.3f}s, "
+                  f"{AI.nodes / elapsed:,.0f} nodes/s, best move {col + 1}")
+
+
+# code here will be ran when valuenet.py is ran
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train and benchmark the value network")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    trainParser = commands.add_parser("train", help="train a network on random games")
+    trainParser.add_argument("--games", type=int, default=200000)
+    trainParser.add_argument("--hidden", type=int, nargs="+", default=[64, 32])
+    trainParser.add_argument("--epochs", type=int, default=10)
+    trainParser.add_argument("--batch", type=int, default=256)
+    trainParser.add_argument("--rate", type=float, default=0.001)
+    trainParser.add_argument("--seed", type=int, default=0)
+    trainParser.add_argument("--out", default=ValueNet.NET_FILE)
+
+    benchParser = commands.add_parser("bench", help="measure positions per second")
+    benchParser.add_argument("--net", help="network file, random weights if not given")
+    benchParser.add_argument("--batches", type=int, nargs="+",
+                             default=[1, 4, 16, 64, 256, 1024, 4096])
+    benchParser.add_argument("--positions", type=int, default=20000)
+    benchParser.add_argument("--depth", type=int, default=4,
+                             help="also time a search of this depth (0 for none)")
+    benchParser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.command == "train":
+        boards, sides, targets = random_positions(args.games, rng)
+        inputs = encode_positions(boards, sides)
+        split = len(inputs) // 10
+        net = ValueNet.random_net(args.hidden, rng)
+        print(f"{args.games} positions, error of always guessing the mean "
+              f"{np.var(targets[split:]):.4f}")
+        train(net, inputs[split:], targets[split:], args.epochs, args.batch,
+              args.rate, rng, validation=(inputs[:split], targets[:split]))
+        net.save(args.out)
+        print("saved " + args.out)
+    else:
+        # Speed does not depend on the weights, so an untrained network measures the same
+        net = ValueNet.load_net(args.net) if args.net else ValueNet.random_net([64, 32], rng)
+        bench(net, args.batches, args.positions, args.depth, rng)